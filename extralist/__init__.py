@@ -1,21 +1,31 @@
 # coding: utf-8
+from .compressing import CompressingPagedList
 from .defaultlist import DefaultList
 from .linked import DoubleLinkedList
 from .pagedlist import PagedList, chunk_sequence
+from .pagedtext import PagedText
 from .sliceable import SliceableSequenceMixin
 from .slicedview import SlicedView
+from .sortedpagedlist import SortedPagedList
+from .spilling import SpillingPagedList
 from .structsequence import StructSequence
+from .threadsafe import ThreadSafePagedList
 from .version import __version__
 
 __author__ = "João S. O. Bueno"
 __license__ = "LGPL v3.0+"
 
 __all__ = [
+    "CompressingPagedList",
     "DefaultList",
     "DoubleLinkedList",
     "PagedList",
+    "PagedText",
     "SlicedView",
+    "SortedPagedList",
+    "SpillingPagedList",
     "StructSequence",
+    "ThreadSafePagedList",
     "SliceableSequenceMixin",
     "chunk_sequence",
     "__version__",
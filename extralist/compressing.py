@@ -0,0 +1,196 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+import lzma
+import pickle
+import time
+import weakref
+import zlib
+
+from .resident import _ResidentPage, _ResidentPagedList
+
+_CODECS = {"zlib": zlib, "lzma": lzma}
+
+
+class _CompressiblePage(_ResidentPage):
+    """A page whose data may be kept compressed in memory.
+
+    'resident' is None while only the compressed bytes, in 'packed', are kept.
+    """
+    __slots__ = ("packed", "raw_size", "length")
+
+    @property
+    def data(self):
+        if self.resident is None:
+            self.owner._decompress(self)
+        self.owner._touch(self)
+        return self.resident
+
+    @data.setter
+    def data(self, value):
+        self.resident = value
+        self.packed = None
+        self.owner._touch(self)
+
+
+class CompressingPagedList(_ResidentPagedList):
+    """PagedList compressing the pages which were not used for a while.
+
+    A page is cold once 'cold_after' other page accesses took place since
+    it was last used, or once it was not used for 'cold_seconds' seconds
+    (either may be None to disable it). Cold pages are pickled — or,
+    for array.array pages, taken as raw bytes — and compressed with
+    the 'codec' module ("zlib" or "lzma"). They are decompressed
+    on their next access.
+
+    Pages are checked whenever a page is accessed, so a list sitting idle
+    keeps its pages as they are: call 'compress_cold' from a timer
+    to compress them anyway. 'compression_stats' reports the memory
+    saved and the number of (de)compressions.
+    """
+
+    page_type = _CompressiblePage
+
+    def __init__(self, sequence=None, pagesize=1000, page_class=list, max_pagesize=None,
+                 min_pagesize=None, cold_after=64, cold_seconds=None, codec="zlib"):
+        self._reset(
+            pagesize, page_class, max_pagesize, min_pagesize, cold_after, cold_seconds, codec
+        )
+        self._fill(sequence)
+
+    def _reset(self, pagesize, page_class, max_pagesize=None, min_pagesize=None,
+               cold_after=64, cold_seconds=None, codec="zlib"):
+        if codec not in _CODECS:
+            raise ValueError(
+                "codec must be one of {}, not {!r}".format(", ".join(sorted(_CODECS)), codec)
+            )
+        if cold_after is not None and cold_after < 1:
+            raise ValueError("cold_after must be at least 1")
+        if cold_seconds is not None and cold_seconds <= 0:
+            raise ValueError("cold_seconds must be positive")
+        self.cold_after = cold_after
+        self.cold_seconds = cold_seconds
+        self.codec = codec
+        self._codec = _CODECS[codec]
+        self._clock = 0
+        self._compression_stats = {"compressions": 0, "decompressions": 0}
+        super()._reset(pagesize, page_class, max_pagesize, min_pagesize)
+
+    def _options(self):
+        options = super()._options()
+        options["cold_after"] = self.cold_after
+        options["cold_seconds"] = self.cold_seconds
+        options["codec"] = self.codec
+        return options
+
+    def _blank_page(self):
+        page = super()._blank_page()
+        page.raw_size = 0
+        return page
+
+    # '_resident' maps page serial numbers to (weak reference, access tick,
+    # access time) for the uncompressed pages
+    def _touch(self, page):
+        self._clock += 1
+        seen = time.monotonic() if self.cold_seconds is not None else 0
+        self._resident[page.serial] = (weakref.ref(page), self._clock, seen)
+        self._resident.move_to_end(page.serial)
+        self._sweep()
+
+    def _sweep(self):
+        resident = self._resident
+        cold_after = self.cold_after
+        cold_seconds = self.cold_seconds
+        now = time.monotonic() if cold_seconds is not None else 0
+        while resident:
+            serial = next(iter(resident))
+            page_ref, tick, seen = resident[serial]
+            if not (
+                cold_after is not None and self._clock - tick >= cold_after or
+                cold_seconds is not None and now - seen >= cold_seconds
+            ) or serial in self._pinned:
+                break
+            del resident[serial]
+            page = page_ref()
+            if page is not None:
+                self._compress(page)
+
+    def _compress(self, page):
+        data = page.resident
+        raw = data.tobytes() if self._typecode else pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+        page.packed = self._codec.compress(raw)
+        page.raw_size = len(raw)
+        page.length = len(data)
+        page.resident = None
+        self._compression_stats["compressions"] += 1
+
+    def _decompress(self, page):
+        raw = self._codec.decompress(page.packed)
+        if self._typecode:
+            data = self.page_class()
+            data.frombytes(raw)
+        else:
+            data = pickle.loads(raw)
+        page.resident = data
+        page.packed = None
+        self._compression_stats["decompressions"] += 1
+
+    def _page_sizes(self):
+        # Compressed pages know their length: no need to decompress them
+        return (page.length if page.resident is None else len(page.resident) for page in self.pages)
+
+    def compress_cold(self):
+        """Compress the pages which became cold since the last page access"""
+        self._sweep()
+
+    def _copy_page(self, page):
+        """New page for another list with the same contents, keeping the data compressed if it is"""
+        if page.resident is not None:
+            return self._new_page(page.resident[:])
+        new_page = self._blank_page()
+        # Compressed bytes are immutable, so both pages can hold them
+        new_page.packed = page.packed
+        new_page.raw_size = page.raw_size
+        new_page.length = page.length
+        return new_page
+
+    def _from_copied_pages(self, copy_pages, sizes):
+        """New instance with the pages returned by copy_pages(new instance)"""
+        new = self.__class__.__new__(self.__class__)
+        new._reset(**self._options())
+        new.pages.extend(copy_pages(new))
+        new._index.rebuild(sizes)
+        new._length = new._index.total()
+        return new
+
+    def copy(self):
+        return self._from_copied_pages(
+            lambda new: [new._copy_page(page) for page in self.pages], self._index.sizes
+        )
+
+    __copy__ = copy
+
+    def _paged_slice(self, lower_page, start_index, upper_page, end_index):
+        sizes = self._index.sizes
+        return self._from_copied_pages(
+            lambda new: (
+                [new._new_page(self.pages[lower_page].data[start_index:])] +
+                [new._copy_page(self.pages[i]) for i in range(lower_page + 1, upper_page)] +
+                [new._new_page(self.pages[upper_page].data[:end_index])]
+            ),
+            [sizes[lower_page] - start_index] + sizes[lower_page + 1: upper_page] + [end_index],
+        )
+
+    def compression_stats(self):
+        """Return a dict with the compression and decompression counts, and the memory saved
+
+        'compressed_pages' tells how many pages are compressed right now,
+        'raw_bytes' their pickled (or raw buffer) size, 'compressed_bytes'
+        the size they take compressed, and 'ratio' the quotient of both.
+        """
+        stats = dict(self._compression_stats)
+        compressed = [page for page in self.pages if page.resident is None]
+        stats["compressed_pages"] = len(compressed)
+        stats["raw_bytes"] = sum(page.raw_size for page in compressed)
+        stats["compressed_bytes"] = sum(len(page.packed) for page in compressed)
+        stats["ratio"] = stats["raw_bytes"] / stats["compressed_bytes"] if compressed else 1.0
+        return stats
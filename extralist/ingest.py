@@ -0,0 +1,80 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+"""Reading record files in large blocks, parsed concurrently and assembled in order"""
+import os
+import struct
+from collections import deque
+
+
+def _read_blocks(fileobj, block_size=1 << 20, record_size=None):
+    """Yield the contents of a binary file in blocks of about block_size bytes
+
+    Blocks end on record boundaries: records are lines, ending in b"\\n",
+    or, given a record_size, fixed-width records of that many bytes.
+    """
+    if record_size is not None:
+        block_size = max(record_size, block_size - block_size % record_size)
+        while True:
+            block = fileobj.read(block_size)
+            if not block:
+                return
+            # Unbuffered files may return short reads
+            while len(block) % record_size:
+                more = fileobj.read(record_size - len(block) % record_size)
+                if not more:
+                    raise ValueError(f"file ends with a partial {record_size}-byte record")
+                block += more
+            yield block
+    pending = b""
+    while True:
+        block = fileobj.read(block_size)
+        if not block:
+            break
+        end = block.rfind(b"\n") + 1
+        if not end:
+            pending += block
+            continue
+        yield pending + block[:end]
+        pending = block[end:]
+    if pending:
+        yield pending
+
+
+def _records(record_size, block):
+    if record_size is None:
+        # Split on b"\n" only, as blocks are: bytes.splitlines would also split on a bare b"\r"
+        lines = block.split(b"\n")
+        if not lines[-1]:
+            lines.pop()
+        return [line[:-1] if line.endswith(b"\r") else line for line in lines]
+    return [block[start: start + record_size] for start in range(0, len(block), record_size)]
+
+
+def _parse_block(parse, record_size, block):
+    records = _records(record_size, block)
+    return records if parse is None else list(map(parse, records))
+
+
+def _pack_block(field_desc, parse, record_size, block):
+    pack = struct.Struct(field_desc).pack
+    return b"".join(pack(*parse(record)) for record in _records(record_size, block))
+
+
+def _map_blocks(function, blocks, executor=None, window=None):
+    """Yield function(block) for each block, in order
+
+    With an executor, up to 'window' blocks (by default, twice the CPU count)
+    are being worked on at once, so the file is read while the
+    first blocks are parsed, without being read whole into memory.
+    """
+    if executor is None:
+        yield from map(function, blocks)
+        return
+    window = window or 2 * (os.cpu_count() or 1)
+    pending = deque()
+    for block in blocks:
+        pending.append(executor.submit(function, block))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
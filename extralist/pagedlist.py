@@ -1,44 +1,334 @@
 # coding: utf-8
 # Author: João S. O. Bueno
 # License: LGPL v 3.0
-import bisect
-from collections.abc import MutableSequence
-from functools import reduce
-import sys
+import asyncio
+import pickle
+import struct
 import warnings
+from array import array
+from collections.abc import MutableSequence
+from functools import cache, partial, reduce
+from itertools import chain, islice, pairwise
 
 from .defaultlist import DefaultList
+from .ingest import _map_blocks, _parse_block, _read_blocks
+
+# Sequence only promises integer indexing: these are the types known to
+# slice into a copy of the requested items (PagedList is checked as well).
+_SLICEABLE_TYPES = (list, tuple, range, str, bytes, bytearray, array)
+
 
+@cache
+def _numpy():
+    """The numpy module, imported on first use — or None, if it is not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
 
+def _is_sliceable(sequence):
+    return isinstance(sequence, _SLICEABLE_TYPES) or isinstance(sequence, PagedList)
 
-def chunk_sequence(sequence, size):
-    sequence = iter(sequence)
+
+def chunk_sequence(sequence, size, chunk_type=list, start=0):
+    """Yield the items in sequence in chunks of 'size' items — the last one may be shorter
+
+    Chunks start at 'start': built-in sequences, arrays and PagedLists are
+    sliced from there, while other iterables go through itertools.islice,
+    skipping 'start' items (for an iterator, from wherever it is) — no item
+    goes through Python code. 'chunk_type' is the type of the chunks: list, tuple, any
+    other type built from an iterable, or an array.array instance, for
+    arrays of its typecode. Slices of the very same type are yielded as they are.
+    With 'memoryview', sequence must support the buffer protocol (bytes,
+    bytearray, array, mmap...) and chunks are views on it, copying nothing.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    if chunk_type is memoryview:
+        view = memoryview(sequence)
+        for chunk_start in range(start, len(view), size):
+            yield view[chunk_start: chunk_start + size]
+        return
+    typecode = None
+    if isinstance(chunk_type, array):
+        typecode = chunk_type.typecode
+        chunk_type = partial(array, typecode)
+    if _is_sliceable(sequence):
+        as_is = type(sequence) is chunk_type or (
+            typecode is not None and isinstance(sequence, array)
+            and sequence.typecode == typecode
+        )
+        for chunk_start in range(start, len(sequence), size):
+            chunk = sequence[chunk_start: chunk_start + size]
+            yield chunk if as_is else chunk_type(chunk)
+        return
+    iterator = islice(sequence, start, None) if start else iter(sequence)
     while True:
-        chunk = []
-        try:
-            for i in range(size):
-                chunk.append(next(sequence))
-        except StopIteration:
-            break
-        yield chunk
-    if chunk:
+        chunk = chunk_type(islice(iterator, size))
+        if not len(chunk):
+            return
         yield chunk
+        if len(chunk) < size:
+            return
 
 
+class _Page:
+    """A PagedList page.
 
+    Pages may share their data with pages in other PagedLists (after
+    a copy or a paged slice): in that case 'refs' is a one-item list,
+    shared by all sharing pages, counting them. The data is only copied
+    when one of them is first written to — see 'PagedList._writable'.
 
-class _Page:
-    __slots__ = ("start", "end", "data")
+    Pages release their share when deleted: on runtimes without reference
+    counting, such as PyPy, pages of a dropped copy keep counting until the
+    garbage collector runs, costing one extra page copy on the next write.
+    """
+    __slots__ = ("start", "end", "data", "refs")
+
+    def share(self):
+        """Return a new page sharing this page data, copy-on-write"""
+        if self.refs is None:
+            self.refs = [1]
+        self.refs[0] += 1
+        page = _Page()
+        page.data = self.data
+        page.refs = self.refs
+        return page
+
+    def unshare(self):
+        """Take exclusive ownership of the page data, copying it if still shared"""
+        refs = self.refs
+        self.refs = None
+        refs[0] -= 1
+        if refs[0]:
+            self.data = self.data[:]
+
+    def __del__(self):
+        refs = getattr(self, "refs", None)
+        if refs is not None:
+            refs[0] -= 1
+
+
+class _LazyPage(_Page):
+    """A page of a PagedList dump, read from the file on its first access"""
+    __slots__ = ("reader", "offset", "nbytes", "resident")
+
+    @property
+    def data(self):
+        if self.reader is not None:
+            self.resident = self.reader.read_at(self.offset, self.nbytes)
+            self.reader = None
+        return self.resident
+
+    @data.setter
+    def data(self, value):
+        self.reader = None
+        self.resident = value
+
+
+_DUMP_MAGIC = b"extralist.PagedList\n"
+_DUMP_LENGTH = struct.Struct("<Q")
+
+
+class _PageReader:
+    """Reads the length-prefixed page records of a PagedList dump"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        # Page records are decoded as they were written, whatever
+        # options the list is loaded with.
+        self.typecode = None
+
+    def _read_length(self):
+        return _DUMP_LENGTH.unpack(self.fileobj.read(_DUMP_LENGTH.size))[0]
+
+    def _decode(self, payload):
+        if self.typecode:
+            data = array(self.typecode)
+            data.frombytes(payload)
+            return data
+        return pickle.loads(payload)
+
+    def read_header(self):
+        if self.fileobj.read(len(_DUMP_MAGIC)) != _DUMP_MAGIC:
+            raise ValueError("Not a PagedList dump")
+        header = pickle.loads(self.fileobj.read(self._read_length()))
+        self.typecode = header["typecode"]
+        return header
+
+    def read_next(self):
+        return self._decode(self.fileobj.read(self._read_length()))
+
+    def read_at(self, offset, nbytes):
+        self.fileobj.seek(offset)
+        return self._decode(self.fileobj.read(nbytes))
+
+    def scan(self, count):
+        """Yield (offset, length) for the next 'count' page records, skipping over their contents"""
+        for _ in range(count):
+            nbytes = self._read_length()
+            offset = self.fileobj.tell()
+            self.fileobj.seek(nbytes, 1)
+            yield offset, nbytes
+
+
+_sentinel = object()
+
+
+def _map_page(func, page_class, data):
+    return page_class(map(func, data))
+
+
+def _filter_page(predicate, page_class, data):
+    return page_class(filter(predicate, data))
+
+
+def _rebuild(cls, items, options):
+    """Unpickle a list pickled as its items, for lists whose pages can't be pickled as they are"""
+    return cls(items, **options)
 
 
 def _empty_page():
     p = _Page()
     p.start = p.end = 0
     p.data = []
+    p.refs = None
     return p
 
 
+class _PageIndex:
+    """Prefix-sum (Fenwick) tree over the lengths of a PagedList pages.
+
+    Resolves a sequence index into a (page number, index in page) pair,
+    and a page number into the sequence offset where it starts, in
+    O(log pages) — regardless of how far the pages have drifted
+    from the nominal pagesize.
+
+    Changing the length of a page is O(log pages) as well. Adding or
+    removing a few pages at either end costs O(log pages) per page:
+    the tree grows or shrinks at its end, and pages dropped from the
+    front leave empty 'head' slots in it, which pages added to the
+    front fill back. Other page changes rebuild the tree from the
+    stored sizes in O(pages).
+    """
+
+    __slots__ = ("sizes", "tree", "top", "head")
+
+    def __init__(self, sizes=()):
+        self.rebuild(sizes)
+
+    def rebuild(self, sizes, head=0):
+        """Build the tree for the given page sizes, after 'head' empty slots"""
+        self.sizes = sizes = list(sizes)
+        tree = [0] * (head + 1)
+        tree.extend(sizes)
+        length = len(tree) - 1
+        for i in range(1, length + 1):
+            parent = i + (i & -i)
+            if parent <= length:
+                tree[parent] += tree[i]
+        self.tree = tree
+        self.head = head
+        self._set_top()
+
+    def _set_top(self):
+        length = len(self.tree) - 1
+        self.top = 1 << (length.bit_length() - 1) if length else 0
+
+    def splice(self, start, stop, sizes):
+        """Replace the sizes for pages[start:stop] with the given sizes"""
+        page_count = len(self.sizes)
+        changed = stop - start + len(sizes)
+        if (start == 0 or stop == page_count) and changed * page_count.bit_length() < page_count:
+            if stop == page_count:
+                for _ in range(stop - start):
+                    self.sizes.pop()
+                    self.tree.pop()
+                for size in sizes:
+                    self._push(size)
+            else:
+                for _ in range(stop):
+                    self._pop_front()
+                for size in reversed(sizes):
+                    self._push_front(size)
+            self._set_top()
+            return
+        new_sizes = self.sizes
+        new_sizes[start:stop] = sizes
+        self.rebuild(new_sizes)
+
+    def _push(self, size):
+        tree = self.tree
+        i = len(tree)
+        # The new node covers the slots (i - lowbit(i), i]
+        tree.append(size + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+        self.sizes.append(size)
+
+    def _pop_front(self):
+        self.add(0, -self.sizes[0])
+        del self.sizes[0]
+        self.head += 1
+        if self.head > 2 * len(self.sizes) + 16:
+            # Too many empty slots: build a compact tree
+            self.rebuild(self.sizes, len(self.sizes) + 16)
+
+    def _push_front(self, size):
+        if not self.head:
+            self.rebuild(self.sizes, len(self.sizes) + 16)
+        self.head -= 1
+        self.sizes.insert(0, 0)
+        self.add(0, size)
+
+    def add(self, page_number, amount):
+        self.sizes[page_number] += amount
+        tree = self.tree
+        length = len(tree)
+        i = page_number + self.head + 1
+        while i < length:
+            tree[i] += amount
+            i += i & -i
+
+    def _prefix(self, slot):
+        tree = self.tree
+        total = 0
+        i = slot
+        while i:
+            total += tree[i]
+            i &= i - 1
+        return total
+
+    def offset(self, page_number):
+        """Count of items stored in all pages before 'page_number'"""
+        return self._prefix(page_number + self.head)
+
+    def total(self):
+        return self._prefix(len(self.tree) - 1)
+
+    def locate(self, index):
+        """Return the page number holding 'index' and the position inside that page.
+
+        Empty pages are skipped over. If index is past the last item,
+        the returned page number is the number of pages.
+        """
+        tree = self.tree
+        length = len(tree) - 1
+        position = 0
+        step = self.top
+        while step:
+            candidate = position + step
+            if candidate <= length and tree[candidate] <= index:
+                position = candidate
+                index -= tree[candidate]
+            step >>= 1
+        return position - self.head, index
+
+    def __len__(self):
+        return len(self.sizes)
+
+
 class PagedList(MutableSequence):
     """
     Sequence designed for high-performance inserting/deleting of elements in the middle.
@@ -50,7 +340,20 @@ class PagedList(MutableSequence):
     position.
 
     PagedList amortizes that by holding several "pages" with sequence parts, so that each
-    insertion only affects one page at a time.
+    insertion only affects one page at a time. A prefix-sum index over the page
+    lengths keeps locating any item at O(log pages).
+
+    'page_class' is the type used for the pages: anything list-like which
+    can be built from an iterable. For numeric data, array.array pages give
+    list-like memory density: pass 'page_class' as an (empty) array.array
+    instance, like 'array("d")', to have pages with its typecode. Slices are
+    then copied as buffers, and the 'sum', 'min', 'max', 'count' and
+    'positions' reductions run per page in C — with NumPy, if it is installed.
+
+    Pages are kept balanced B+-tree style: a page growing past 'max_pagesize'
+    (default: twice the pagesize) is split, and one shrinking below 'min_pagesize'
+    (default: a quarter of the pagesize) is merged with, or borrows items from,
+    a neighbour page.
 
     """
 
@@ -59,6 +362,11 @@ class PagedList(MutableSequence):
 
     slice_to_paged = False
 
+    # Set to True (on the class or an instance) to verify the internal
+    # length counter and page index against the page contents after
+    # every change. Slow: meant for debugging and tests only.
+    debug = False
+
     _lock_pagesize = False
 
     def __new__(cls, *args, **kw):
@@ -68,28 +376,179 @@ class PagedList(MutableSequence):
         )
         return super().__new__(cls)
 
-    def __init__(self, sequence=None, pagesize=1000, page_class=list):
-        self._reset(pagesize, page_class)
+    def __init__(self, sequence=None, pagesize=1000, page_class=list, max_pagesize=None,
+                 min_pagesize=None):
+        self._reset(pagesize, page_class, max_pagesize, min_pagesize)
         self._fill(sequence)
 
-    def _reset(self, pagesize, page_class):
+    def _reset(self, pagesize, page_class, max_pagesize=None, min_pagesize=None):
         self.pagesize = pagesize
+        if isinstance(page_class, array):
+            page_class = partial(array, page_class.typecode)
         self.page_class = page_class
-        # DefaultList is used because when computing slices that extend to
-        # self.END the page number will be one more than the actual existing pages.
-        # (and len(self.pages) is super-useful to keep track of the actual number of
-        # pages)
+        sample = page_class()
+        # Pages holding native numbers in a buffer get the vectorized paths
+        self._typecode = sample.typecode if isinstance(sample, array) else None
+        self.max_pagesize = max_pagesize if max_pagesize is not None else 2 * pagesize
+        self.min_pagesize = min_pagesize if min_pagesize is not None else pagesize // 4
+        if self.max_pagesize < 1 or not 0 <= self.min_pagesize <= self.max_pagesize // 2:
+            raise ValueError(
+                "min_pagesize must be at most half of max_pagesize "
+                f"(got {self.min_pagesize} and {self.max_pagesize})"
+            )
+        # DefaultList is used so that a page past the end can be fetched
+        # as an empty page. (and len(self.pages) is super-useful to keep
+        # track of the actual number of pages)
         self.pages = DefaultList(default_factory=_empty_page, append_on_extra=True)
-        self._dirt_log = []
+        self._index = _PageIndex()
+        self._length = 0
+        # Bumped on every change in the sequence structure, so that
+        # iterators can detect the list changed under them.
+        self._version = 0
 
     @classmethod
-    def _from_pages(cls, pages, pagesize, page_class):
+    def _from_pages(cls, pages, sizes=None, **options):
+        """Build a new instance holding the given _Page objects
+
+        If the page sizes are known, passing them avoids touching the page data.
+        """
         self = cls.__new__(cls)
-        self._reset(pagesize, page_class)
-        for i, page in enumerate(pages):
-            self._append_page(page)
-            if len(page) != pagesize:
-                self._dirt_log.append([i, len(page) - pagesize])
+        self._reset(**options)
+        self.pages.extend(pages)
+        if sizes is None or not self.pages:
+            self._reindex()
+        else:
+            self._index.rebuild(sizes)
+            self._length = self._index.total()
+        return self
+
+    def copy(self):
+        """Return a shallow copy of the list
+
+        Pages are shared with the copy and only copied on the first write
+        to either list, so copying costs O(pages) rather than O(items).
+        """
+        return self._from_pages(
+            [page.share() for page in self.pages], sizes=self._index.sizes, **self._options()
+        )
+
+    __copy__ = copy
+
+    def _options(self):
+        """Keyword arguments to create another instance with the same page layout"""
+        return {
+            "pagesize": self.pagesize,
+            "page_class": self.page_class,
+            "max_pagesize": self.max_pagesize,
+            "min_pagesize": self.min_pagesize,
+        }
+
+    def _settings(self):
+        """Instance settings, other than the page layout, to carry over to a rebuilt list"""
+        return {"slice_to_paged": self.slice_to_paged, "debug": self.debug}
+
+    def dump(self, fileobj):
+        """Write the list into a binary file, one page at a time
+
+        The file starts with a header holding the page layout options and
+        the page lengths, followed by a record for each page: the raw buffer
+        for array.array pages, or the pickled page data otherwise.
+        """
+        header = pickle.dumps(
+            {
+                "format": 1,
+                "options": self._options(),
+                "typecode": self._typecode,
+                "sizes": self._index.sizes,
+            },
+            pickle.HIGHEST_PROTOCOL
+        )
+        fileobj.write(_DUMP_MAGIC)
+        fileobj.write(_DUMP_LENGTH.pack(len(header)))
+        fileobj.write(header)
+        for page in self.pages:
+            data = page.data
+            if self._typecode:
+                fileobj.write(_DUMP_LENGTH.pack(len(data) * data.itemsize))
+                fileobj.write(data)
+                continue
+            payload = pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+            fileobj.write(_DUMP_LENGTH.pack(len(payload)))
+            fileobj.write(payload)
+
+    @classmethod
+    def load(cls, fileobj, lazy=False, **options):
+        """Read a list written by 'dump' from a binary file
+
+        Keyword arguments override the options stored in the file.
+        With 'lazy', only the header is read upfront, and each page is read
+        when it is first accessed: the file must then be seekable, and kept
+        open for as long as the list is in use.
+
+        As with pickle, only load files from trusted sources.
+        """
+        reader = _PageReader(fileobj)
+        header = reader.read_header()
+        options = dict(header["options"], **options)
+        sizes = header["sizes"]
+        if lazy:
+            if cls._new_page is not PagedList._new_page:
+                raise ValueError(f"{cls.__name__} pages can't be loaded lazily")
+            pages = []
+            for offset, nbytes in reader.scan(len(sizes)):
+                page = _LazyPage()
+                page.refs = None
+                page.reader, page.offset, page.nbytes = reader, offset, nbytes
+                pages.append(page)
+            return cls._from_pages(pages, sizes=sizes, **options)
+        self = cls.__new__(cls)
+        self._reset(**options)
+        for _ in sizes:
+            self._append_page(reader.read_next())
+        self._reindex()
+        return self
+
+    @classmethod
+    def from_file(cls, fileobj, parse=None, record_size=None, executor=None, block_size=1 << 20,
+                  **options):
+        """Build a list from the records in a binary file
+
+        Records are lines (without their line ending) or, given a record_size,
+        fixed-width records of that many bytes. The file is read in blocks
+        of about block_size bytes, split on record boundaries, and each block
+        has its records passed through 'parse' (they are kept as bytes if it
+        is None) — as an executor task, if an executor is given: use a
+        ProcessPoolExecutor to parse on all cores ('parse' must then be
+        picklable, as a module level function). Results are kept in order.
+
+        Keyword arguments are the options to the class constructor.
+        """
+        parsed = _map_blocks(
+            partial(_parse_block, parse, record_size),
+            _read_blocks(fileobj, block_size, record_size),
+            executor,
+        )
+        return cls(chain.from_iterable(parsed), **options)
+
+    @classmethod
+    async def afrom(cls, async_iterable, **options):
+        """Build a list from an async iterable, such as a network reader or an async DB cursor
+
+        Pages are filled as the items arrive, giving other tasks a chance
+        to run after each page. Keyword arguments are the constructor options.
+        """
+        self = cls(**options)
+        del self.pages[:]
+        chunk = []
+        async for item in async_iterable:
+            chunk.append(item)
+            if len(chunk) >= self.pagesize:
+                self._append_page(self.page_class(chunk))
+                chunk = []
+                await asyncio.sleep(0)
+        if chunk:
+            self._append_page(self.page_class(chunk))
+        self._reindex()
         return self
 
     @property
@@ -105,85 +564,190 @@ class PagedList(MutableSequence):
         raise RuntimeError("Pagesize for {} can't be changed after instantiation".format(self.__class__.__name__))
 
     def _fill(self, sequence):
-        if not hasattr(sequence, "__len__"):
-            for chunk in chunk_sequence(sequence, self.pagesize):
-                self._append_page(self.page_class(chunk))
-            return
-        for page_start in range(0, len(sequence), self.pagesize):
-            self._append_page(self.page_class(sequence[page_start: page_start + self.pagesize]))
+        if sequence is None:
+            sequence = ()
+        for chunk in self._chunks(sequence):
+            self._append_page(chunk)
+        self._reindex()
+
+    def _chunks(self, sequence, start=0):
+        """Split sequence into page_class chunks of pagesize items
+
+        Chunks start at 'start' — for iterators, after skipping that many items.
+        """
+        chunk_type = array(self._typecode) if self._typecode else self.page_class
+        return chunk_sequence(sequence, self.pagesize, chunk_type, start)
 
     def _append_page(self, chunk):
+        self.pages.append(self._new_page(chunk))
+
+    def _new_page(self, chunk):
         page = _Page()
         # page.start = len(self.pages) * self.pagesize
         page.data = chunk
-        self.pages.append(page)
+        page.refs = None
+        return page
 
-    def _adjust_dirt(self, page_number, amount, absolute=False):
-        dirt_record = bisect.bisect_left(self._dirt_log, [page_number, -sys.maxsize])
-        if (len(self._dirt_log) <= dirt_record or not self._dirt_log[dirt_record][0] == page_number):
-            if amount:
-                bisect.insort(self._dirt_log, [page_number, amount])
-            return
-        else:
-            if not absolute:
-                self._dirt_log[dirt_record][1] += amount
-            else:
-                self._dirt_log[dirt_record][1] = amount
-            if self._dirt_log[dirt_record][1] == 0:
-                del self._dirt_log[dirt_record]
-
-    def _reset_dirt(self, page_number = None):
-        if page_number is not None:
-            amount = len(self.pages[page_number].data) - self.pagesize
-            self._adjust_dirt(page_number, amount, absolute=True)
+    def _writable(self, page_number):
+        """Return the data for the given page, ready to be changed in place"""
+        page = self.pages[page_number]
+        if page.refs is not None:
+            page.unshare()
+        return page.data
+
+    def _reindex(self):
+        # There is always at least one page, so that the position
+        # past the last item can be resolved to it.
+        if not self.pages:
+            self._append_page(self.page_class())
+        self._index.rebuild(self._page_sizes())
+        self._length = self._index.total()
+        self._version += 1
+        if self.debug:
+            self._check_consistency()
+
+    def _page_sizes(self):
+        return (len(page.data) for page in self.pages)
+
+    def _resized(self, page_number, amount):
+        """Bookkeeping for 'amount' items added to (or removed from) a page"""
+        self._index.add(page_number, amount)
+        if amount:
+            self._length += amount
+            self._version += 1
+        if self.debug:
+            self._check_consistency()
+
+    def _spliced(self, start, stop, sizes):
+        """Bookkeeping for pages[start:stop] replaced by pages with the given sizes"""
+        sizes = list(sizes)
+        self._length += sum(sizes) - sum(self._index.sizes[start:stop])
+        self._index.splice(start, stop, sizes)
+        self._version += 1
+        if self.debug:
+            self._check_consistency()
+
+    def _check_consistency(self):
+        sizes = [len(page.data) for page in self.pages]
+        if sizes != self._index.sizes:
+            raise RuntimeError(
+                f"{self.__class__.__name__} page index is out of sync with its pages"
+            )
+        if self._length != sum(sizes) or self._length != self._index.total():
+            raise RuntimeError(
+                f"{self.__class__.__name__} length counter is {self._length}, "
+                f"but pages hold {sum(sizes)} items"
+            )
+
+    # Instrumentation: 'instrument' shadows some internal methods with
+    # counting wrappers set on the instance itself, so that lists which
+    # are not instrumented run the plain methods, at no extra cost.
+
+    _instrumented_events = {
+        "_get_indices": "lookups",
+        "_replace_in_page": "slice_writes_in_page",
+        "_replace_span": "slice_writes_across_pages",
+        "_replace_extended": "slice_writes_extended",
+        "_split_page": "page_splits",
+        "_merge_page": "page_merges",
+    }
+
+    def instrument(self, enabled=True, callback=None):
+        """Start (or, with enabled=False, stop) counting internal operations
+
+        The counts are reported by 'stats'. If given, 'callback' is called as
+        callback(event, args) for each counted operation, with the counter name
+        and the arguments of the internal call.
+        Instrumented lists can't be pickled.
+        """
+        for name in list(self._instrumented_events) + ["_writable"]:
+            self.__dict__.pop(name, None)
+        if not enabled:
+            self.__dict__.pop("_counters", None)
             return
-        self._dirt_log = []
-        for i, page in enumerate(self.pages):
-            amount = len(page.data) - self.pagesize
-            if amount:
-                self._dirt_log.append([i, amount])
+        counters = self._counters = dict.fromkeys(self._instrumented_events.values(), 0)
+        counters["page_writes"] = counters["page_copies"] = 0
+
+        def counting(event, method):
+            def wrapper(*args):
+                counters[event] += 1
+                if callback is not None:
+                    callback(event, args)
+                return method(*args)
+            return wrapper
+
+        for name, event in self._instrumented_events.items():
+            setattr(self, name, counting(event, getattr(self, name)))
+        writable = counting("page_writes", self._writable)
+
+        def copy_counting_writable(page_number):
+            if self.pages[page_number].refs is not None:
+                counters["page_copies"] += 1
+                if callback is not None:
+                    callback("page_copies", (page_number,))
+            return writable(page_number)
 
+        self._writable = copy_counting_writable
 
-    def _local_offset(self, page_number):
-        dirt_record = bisect.bisect_left(self._dirt_log, [page_number, -sys.maxsize])
-        if len(self._dirt_log) <= dirt_record or not self._dirt_log[dirt_record][0] == page_number:
-            return 0
-        return self._dirt_log[dirt_record][1]
+    def stats(self):
+        """Return a snapshot of the list layout, and of the counts taken since 'instrument'
+
+        'index_depth' is the number of steps each index lookup takes, and
+        'shared_pages' the number of pages still shared copy-on-write
+        with copies or slices of the list.
+        """
+        sizes = self._index.sizes
+        stats = {
+            "length": self._length,
+            "pages": len(sizes),
+            "index_depth": self._index.top.bit_length(),
+            "shared_pages": sum(1 for page in self.pages if page.refs is not None),
+            "page_sizes": {
+                "min": min(sizes),
+                "max": max(sizes),
+                "mean": self._length / len(sizes),
+                "below_min_pagesize": sum(1 for size in sizes if size < self.min_pagesize),
+                "above_pagesize": sum(1 for size in sizes if size > self.pagesize),
+            },
+        }
+        stats.update(getattr(self, "_counters", None) or {})
+        return stats
 
     def _get_indices(self, index):
-        page_number= index // self.pagesize
-        if not self._dirt_log:
-            return page_number,  index % self.pagesize
-
-        while True:
-            # TODO: optimize this by enabling relative offset seeks:
-            page_offset = self._get_offset_for_page(page_number)
-
-            element_index = (index - page_offset) - (page_number * self.pagesize)
-            if 0 <= element_index < self.pagesize + self._local_offset(page_number):
-                break
-            if element_index < 0:
-                page_number -= 1
-                if page_number < 0:
-                    raise IndexError
-            else:
-                page_number += 1
-        return page_number, element_index
+        """Resolve 0 <= index <= len(self) into (page number, index in page)
+
+        The position just past the last item resolves to the end
+        of the last page.
+        """
+        page_number, page_index = self._index.locate(index)
+        if page_number >= len(self._index):
+            if page_index or index < 0:
+                raise IndexError(f"{self.__class__.__name__} index out of range")
+            page_number = len(self._index) - 1
+            page_index = self._index.sizes[page_number]
+        return page_number, page_index
 
     def _get_offset_for_page(self, page_number):
-        offset = 0
-        for dirt in self._dirt_log:
-            if dirt[0] >= page_number:
-                break
-            offset += dirt[1]
-        return offset
+        return self._index.offset(page_number)
+
+    def _normalize_index(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        return index
 
     def _get_slice_interval(self, slice_):
-        s_start, s_stop, s_step = slice_.indices(len(self))
-        s_stop = s_start + (s_stop - s_start) - (s_stop - s_start) % s_step
+        s_start, s_stop, _ = slice_.indices(len(self))
+        if s_stop < s_start:
+            s_stop = s_start
 
         lower_page, start_index = self._get_indices(s_start)
         upper_page, end_index = self._get_indices(s_stop)
+        if upper_page < lower_page:
+            # Empty slice starting on a page boundary
+            upper_page, end_index = lower_page, start_index
         middle_pages = list(range(lower_page + 1, upper_page))
 
         return lower_page, start_index, middle_pages, upper_page, end_index
@@ -193,144 +757,860 @@ class PagedList(MutableSequence):
             if index.step is not None and index.step != 1:
                 result_generator = (self[i] for i in range(*index.indices(len(self))))
                 return (
-                    self.__class__(result_generator, pagesize=self.pagesize, page_class=self.page_class)
+                    self.__class__(result_generator, **self._options())
                         if self.slice_to_paged else
                     self.page_class(result_generator)
                 )
             lower_page, start_index, middle_pages, upper_page, end_index = self._get_slice_interval(index)
             if not self.slice_to_paged:
                 if lower_page < upper_page:
-                    result_slice = reduce(lambda prev, next: prev + next,
-                                    (self.pages[i].data for i in middle_pages),
-                                    self.pages[lower_page].data[start_index:]
-                    ) + self.pages[upper_page].data[:end_index]
-                else:
-                    result_slice = self.pages[lower_page].data[start_index: end_index]
-
-                return result_slice if self.page_class is list else self.page_class(result_slice)
+                    return self._read_span(lower_page, start_index, upper_page, end_index)
+                result_slice = self.pages[lower_page].data[start_index: end_index]
+                if self.page_class is list or self._typecode:
+                    return result_slice
+                return self.page_class(result_slice)
             if lower_page < upper_page:
-                return (self.__class__._from_pages((
-                        [self.pages[lower_page].data[start_index:]] +
-                        [self.pages[i].data[:] for i in middle_pages] +
-                        [self.pages[upper_page].data[:end_index] ]
-                    ),
-                    pagesize = self.pagesize,
-                    page_class = self.page_class
-                ))
+                return self._paged_slice(lower_page, start_index, upper_page, end_index)
             else:
                 return self.__class__(
                     self.pages[lower_page].data[start_index: end_index],
-                    pagesize=self.pagesize,
-                    page_class=self.page_class,
+                    **self._options()
                 )
 
-        if index < 0:
-            index += len(self)
-        page_number, page_index = self._get_indices(index)
+        page_number, page_index = self._get_indices(self._normalize_index(index))
         return self.pages[page_number].data[page_index]
 
+    def _paged_slice(self, lower_page, start_index, upper_page, end_index):
+        """Build a new PagedList for a multi-page span, sharing the pages fully inside it"""
+        sizes = self._index.sizes
+        return self._from_pages(
+            [self._new_page(self.pages[lower_page].data[start_index:])] +
+            [self.pages[i].share() for i in range(lower_page + 1, upper_page)] +
+            [self._new_page(self.pages[upper_page].data[:end_index])],
+            sizes=(
+                [sizes[lower_page] - start_index] + sizes[lower_page + 1: upper_page] + [end_index]
+            ),
+            **self._options()
+        )
+
+    def _read_span(self, lower_page, start_index, upper_page, end_index):
+        """Copy the items from lower_page/start_index up to upper_page/end_index into a new sequence
+
+        The result is allocated once, and each page is copied straight into place.
+        """
+        offset = self._index.offset(lower_page)
+        length = self._index.offset(upper_page) - offset + end_index - start_index
+        if self._typecode:
+            return self._read_buffer_span(lower_page, start_index, upper_page, end_index, length)
+        result = [None] * length
+        position = len(self.pages[lower_page].data) - start_index
+        result[:position] = self.pages[lower_page].data[start_index:]
+        for page_number in range(lower_page + 1, upper_page):
+            data = self.pages[page_number].data
+            result[position: position + len(data)] = data
+            position += len(data)
+        result[position:] = self.pages[upper_page].data[:end_index]
+        return result if self.page_class is list else self.page_class(result)
+
+    def _read_buffer_span(self, lower_page, start_index, upper_page, end_index, length):
+        result = array(self._typecode, bytes(length * array(self._typecode).itemsize))
+        with memoryview(result) as target:
+            data = self.pages[lower_page].data
+            position = len(data) - start_index
+            target[:position] = memoryview(data)[start_index:]
+            for page_number in range(lower_page + 1, upper_page):
+                data = self.pages[page_number].data
+                target[position: position + len(data)] = memoryview(data)
+                position += len(data)
+            target[position:] = memoryview(self.pages[upper_page].data)[:end_index]
+        return result
+
     def __setitem__(self, index, value):
         if isinstance(index, slice):
             values = value
-            if not hasattr(values, "__len__"):
+            if self._typecode:
+                if not isinstance(values, array) or values.typecode != self._typecode:
+                    values = array(self._typecode, values)
+            elif not _is_sliceable(values) or values is self:
+                # Page updates slice the values
                 values = list(values)
             if index.step is None or index.step == 1:
                 lower_page, start_index, middle_pages, upper_page, end_index = self._get_slice_interval(index)
                 # TODO :specialize if values is instance of PagedList
                 if len(values) <= self.pagesize and lower_page == upper_page:
-                        self.pages[lower_page].data[start_index: end_index] = values
-                        self._adjust_dirt(lower_page, len(values) - (end_index - start_index))
-                        return
-                    # Add the end of values to the upper page:
-                else:
-                    start = 0; end = len(values)
-                    if end_index != 0:
-                        self.pages[upper_page].data[:end_index] = values[-end_index:]
-                        end -= end_index
-                        if end_index > len(values):
-                            self._reset_dirt(upper_page)
-                    if start_index < len(self.pages[lower_page].data):
-                        len_lower_page = len(self.pages[lower_page].data)
-                        self.pages[lower_page].data[start_index:] = values[:len_lower_page - start_index]
-                        # self._reset_dirt(lower_page) # (pagesize is unchanged)
-                        start = len_lower_page - start_index
-
-                        for page_num in middle_pages:
-                            self.pages[page_num].data[:] = values[start: min(start + self.pagesize, end)]
-                            self._reset_dirt(page_num)
-                            start += self.pagesize
-                            if start >= end:
-                                break
-
-                        if not middle_pages:
-                            page_num = lower_page
-
-                        if start >= end:
-                            # values is finished and there are middle pages left
-                            del self.pages[page_num + 1: middle_pages[-1] + 1]
-                        else:
-                            # need to insert new page(s)
-                            for j, start in enumerate(range(start, end, self.pagesize), page_num + 1):
-                                new_page = _Page()
-                                new_page.data = self.page_class(values[start: min(start + self.pagesize, end)])
-                                self.pages.insert(j, new_page)
-
-                        self._reset_dirt()
-                        return
-
-                    # add middle pages
+                    self._replace_in_page(lower_page, start_index, end_index, values)
+                    return
+                self._replace_span(lower_page, start_index, upper_page, end_index, values)
+                return
 
             else:
-                # extended slice: copy items one by one.
-                all_indices = range(*index.indices(len(self)))
-                if len(all_indices) != len(values):
-                    raise ValueError(
-                        "attempt to assign sequence of size {} to extended slice of size {}".format(
-                        len(value), len(all_indices))
-                    )
-                for i, v in zip(all_indices, values):
-                    self[i] = v
+                self._replace_extended(index, values)
                 return
 
-        if index < 0:
-            index += len(self)
-        page_number, page_index = self._get_indices(index)
-        self.pages[page_number].data[page_index] = value
+        page_number, page_index = self._get_indices(self._normalize_index(index))
+        self._writable(page_number)[page_index] = value
+
+    def _replace_in_page(self, page_number, start_index, end_index, values):
+        self._writable(page_number)[start_index: end_index] = values
+        self._resized(page_number, len(values) - (end_index - start_index))
+        self._rebalance(page_number)
+
+    def _replace_extended(self, slice_, values):
+        # extended slice: copy items one by one.
+        all_indices = range(*slice_.indices(len(self)))
+        if len(all_indices) != len(values):
+            raise ValueError(
+                f"attempt to assign sequence of size {len(values)} "
+                f"to extended slice of size {len(all_indices)}"
+            )
+        for i, v in zip(all_indices, values, strict=True):
+            self[i] = v
+
+    def _replace_span(self, lower_page, start_index, upper_page, end_index, values):
+        """Replace items from lower_page/start_index up to upper_page/end_index with values
+
+        The lower page is filled up to pagesize with the first values, and the
+        upper page with the last ones — the remaining values go into new pages
+        inserted between both.
+        """
+        lower = self._writable(lower_page)
+        if lower_page == upper_page:
+            upper = lower[end_index:]
+            stop = lower_page + 1
+        else:
+            upper = self._writable(upper_page)
+            del upper[:end_index]
+            stop = upper_page
+        room = max(self.pagesize - start_index, 0)
+        lower[start_index:] = values[:room]
+        values_end = len(values)
+        upper_room = min(max(self.pagesize - len(upper), 0), max(values_end - room, 0))
+        if upper_room:
+            values_end -= upper_room
+            upper[:0] = values[values_end:]
+        new_pages = [
+            self._new_page(
+                self.page_class(values[chunk_start: min(chunk_start + self.pagesize, values_end)])
+            )
+            for chunk_start in range(room, values_end, self.pagesize)
+        ]
+        if lower_page == upper_page and len(upper):
+            new_pages.append(self._new_page(upper))
+        self.pages[lower_page + 1: stop] = new_pages
+        new_stop = lower_page + 1 + len(new_pages) + (stop == upper_page)
+        new_sizes = (len(page.data) for page in self.pages[lower_page: new_stop])
+        self._spliced(lower_page, upper_page + 1, new_sizes)
+        for page_number in range(new_stop - 1, lower_page - 1, -1):
+            self._rebalance(page_number)
 
     def __delitem__(self, index):
         if isinstance(index, slice):
             if index.step is None or index.step == 1:
                 lower_page, start_index, middle_pages, upper_page, end_index = self._get_slice_interval(index)
                 if lower_page == upper_page:
-                    self.pages[lower_page].data[start_index:end_index] = []
-                    self._reset_dirt(lower_page)
+                    del self._writable(lower_page)[start_index:end_index]
+                    self._resized(lower_page, start_index - end_index)
+                    self._rebalance(lower_page)
                     return
-                self.pages[lower_page].data[start_index:] = []
-                self.pages[upper_page].data[:end_index] = []
+                del self._writable(lower_page)[start_index:]
+                del self._writable(upper_page)[:end_index]
                 if middle_pages:
                     del self.pages[middle_pages[0]:middle_pages[-1] + 1]
-                self._reset_dirt()
+                self._spliced(
+                    lower_page,
+                    upper_page + 1,
+                    [len(self.pages[lower_page].data), len(self.pages[lower_page + 1].data)]
+                )
+                self._rebalance(lower_page + 1)
+                self._rebalance(lower_page)
                 return
             else:
-                # extended slice: del items one by one.
-                del_count = 0
-                for single_index in range(*index.indices(len(self))):
-                    del self[single_index - del_count]
-                    del_count += 1
+                # extended slice: del items one by one, from the last one.
+                for single_index in sorted(range(*index.indices(len(self))), reverse=True):
+                    del self[single_index]
 
                 return
 
-        page_number, page_index = self._get_indices(index)
-        del self.pages[page_number].data[page_index]
-        self._adjust_dirt(page_number, -1)
+        page_number, page_index = self._get_indices(self._normalize_index(index))
+        del self._writable(page_number)[page_index]
+        self._resized(page_number, -1)
+        self._rebalance(page_number)
 
     def __len__(self):
-        last_page_number = len(self.pages) - 1
-        return self.pagesize * last_page_number + len(self.pages[-1].data) + self._get_offset_for_page(last_page_number)
+        return self._length
+
+    # Iteration and searches run over each page data natively, instead of
+    # the MutableSequence mixins, which would locate each item by index.
+
+    def _check_version(self, version):
+        if self._version != version:
+            raise RuntimeError(f"{self.__class__.__name__} changed size during iteration")
+
+    def __iter__(self):
+        version = self._version
+        for page in self.pages:
+            yield from page.data
+            self._check_version(version)
+
+    def __reversed__(self):
+        version = self._version
+        for page in reversed(self.pages):
+            yield from reversed(page.data)
+            self._check_version(version)
+
+    async def aiter_pages(self):
+        """Asynchronously yield the data of each page, in order
+
+        Other tasks get a chance to run between pages, so scanning a large
+        list does not stall the event loop. The page data must not be changed,
+        and, as in iteration, resizing the list meanwhile raises RuntimeError.
+        """
+        version = self._version
+        for page in self.pages:
+            yield page.data
+            await asyncio.sleep(0)
+            self._check_version(version)
+
+    async def __aiter__(self):
+        async for data in self.aiter_pages():
+            for item in data:
+                yield item
+
+    def __contains__(self, value):
+        return any(value in page.data for page in self.pages)
+
+    def count(self, value):
+        return sum(page.data.count(value) for page in self.pages)
+
+    # Reductions: each page is handed to C code at once — NumPy for
+    # array.array pages, if available.
+
+    def _vectorized(self):
+        return self._typecode is not None and self._typecode not in "uw" and _numpy() is not None
+
+    def _vectors(self):
+        """Yield the data of each non-empty page, as a NumPy view if _vectorized()"""
+        vectorized = self._vectorized()
+        numpy = _numpy() if vectorized else None
+        for page in self.pages:
+            data = page.data
+            if len(data):
+                yield numpy.frombuffer(data, dtype=self._typecode) if vectorized else data
+
+    def sum(self, start=0):
+        # NumPy integer sums could overflow, so only floats are summed there
+        if self._vectorized() and self._typecode in "fd":
+            return start + sum(vector.sum().item() for vector in self._vectors())
+        return sum((sum(page.data) for page in self.pages), start)
+
+    def min(self):
+        if self._vectorized():
+            values = [vector.min().item() for vector in self._vectors()]
+        else:
+            values = [min(data) for data in self._vectors()]
+        if not values:
+            raise ValueError(f"min() of an empty {self.__class__.__name__}")
+        return min(values)
+
+    def max(self):
+        if self._vectorized():
+            values = [vector.max().item() for vector in self._vectors()]
+        else:
+            values = [max(data) for data in self._vectors()]
+        if not values:
+            raise ValueError(f"max() of an empty {self.__class__.__name__}")
+        return max(values)
+
+    def positions(self, value):
+        """Return a list with the indices of all items equal to value"""
+        result = []
+        offset = 0
+        vectorized = self._vectorized() and isinstance(value, (int, float))
+        numpy = _numpy() if vectorized else None
+        for page in self.pages:
+            data = page.data
+            if vectorized:
+                vector = numpy.frombuffer(data, dtype=self._typecode)
+                result.extend((numpy.flatnonzero(vector == value) + offset).tolist())
+            else:
+                position = -1
+                try:
+                    while True:
+                        position = data.index(value, position + 1)
+                        result.append(offset + position)
+                except ValueError:
+                    pass
+            offset += len(data)
+        return result
+
+    # Per-page work which may run on a concurrent.futures executor, one
+    # task per page. For process pools, the functions passed in
+    # (and the page data) must be picklable.
+
+    def _map_over_pages(self, function, executor=None, skip_empty=False):
+        """Return the list of function(page data) for all pages, in order"""
+        datas = [
+            page.data for page, size in zip(self.pages, self._index.sizes, strict=True)
+            if size or not skip_empty
+        ]
+        if executor is None:
+            return [function(data) for data in datas]
+        return list(executor.map(function, datas))
+
+    def _with_pages(self, datas, sizes):
+        """Build a new instance with the same options, holding the given page data"""
+        new = self.__class__.__new__(self.__class__)
+        new._reset(**self._options())
+        for data in datas:
+            new._append_page(data)
+        new._index.rebuild(sizes)
+        new._length = new._index.total()
+        return new
+
+    def _replace_pages(self, datas):
+        """Replace all pages with the given page data
+
+        Empty pages are dropped, and pages below min_pagesize are merged
+        with the previous one, if they fit. The bookkeeping is updated once.
+        """
+        merged = []
+        for data in datas:
+            if not len(data):
+                continue
+            if merged and min(len(merged[-1]), len(data)) < self.min_pagesize and \
+                    len(merged[-1]) + len(data) <= self.max_pagesize:
+                merged[-1].extend(data)
+            else:
+                merged.append(data)
+        if not merged:
+            merged.append(self.page_class())
+        page_count = len(self.pages)
+        self.pages[:] = [self._new_page(data) for data in merged]
+        self._spliced(0, page_count, [len(data) for data in merged])
+
+    def map_pages(self, func, executor=None):
+        """Return a new list with func applied to each item, page by page
+
+        The result has the same options and page layout. If an executor
+        is given, each page is mapped as one of its tasks.
+        """
+        datas = self._map_over_pages(partial(_map_page, func, self.page_class), executor)
+        return self._with_pages(datas, self._index.sizes)
+
+    def filter_inplace(self, predicate, executor=None):
+        """Keep only the items for which predicate(item) is true
+
+        Each page is filtered at once (as an executor task, if an executor is given),
+        then pages left empty are dropped and the small ones merged.
+        """
+        self._replace_pages(
+            self._map_over_pages(partial(_filter_page, predicate, self.page_class), executor)
+        )
+
+    def remove_if(self, predicate):
+        """Remove all items for which predicate(item) is true
+
+        Each page is rebuilt at once, instead of deleting the items one
+        by one. Pages left empty are dropped and small ones merged.
+        """
+        self._sift(predicate, keep=False)
+
+    def retain(self, predicate):
+        """Remove all items for which predicate(item) is false"""
+        self._sift(predicate, keep=True)
+
+    def _sift(self, predicate, keep):
+        datas = []
+        for page in self.pages:
+            if keep:
+                kept = [item for item in page.data if predicate(item)]
+            else:
+                kept = [item for item in page.data if not predicate(item)]
+            datas.append(kept if self.page_class is list else self.page_class(kept))
+        if sum(len(data) for data in datas) == self._length:
+            return
+        self._replace_pages(datas)
+
+    def reduce_pages(self, func, combine, initial=_sentinel, executor=None):
+        """Reduce the list by calling func on each page data, then folding the results with combine
+
+        For instance, 'reduce_pages(sum, operator.add)' sums the list.
+        Empty pages are skipped. If an executor is given, func runs there,
+        one task per page.
+        """
+        results = self._map_over_pages(func, executor, skip_empty=True)
+        if initial is not _sentinel:
+            return reduce(combine, results, initial)
+        if not results:
+            raise TypeError(
+                f"reduce_pages() of an empty {self.__class__.__name__} with no initial value"
+            )
+        return reduce(combine, results)
+
+    def index(self, value, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start < stop:
+            page_number, page_index = self._get_indices(start)
+            offset = start - page_index
+            sizes = self._index.sizes
+            while offset < stop:
+                end = min(sizes[page_number], stop - offset)
+                if page_index < end:
+                    try:
+                        return offset + self.pages[page_number].data.index(value, page_index, end)
+                    except ValueError:
+                        pass
+                offset += sizes[page_number]
+                page_number += 1
+                page_index = 0
+        raise ValueError(f"{value!r} is not in {self.__class__.__name__}")
 
     def insert(self, index, value):
+        length = len(self)
+        if index < 0:
+            index = max(index + length, 0)
+        elif index > length:
+            index = length
         page_number, page_index = self._get_indices(index)
-        self.pages[page_number].data.insert(page_index, value)
-        self._adjust_dirt(page_number, +1)
+        self._writable(page_number).insert(page_index, value)
+        self._resized(page_number, +1)
+        self._rebalance(page_number)
 
+    def insert_many(self, pairs):
+        """Insert each (index, value) pair, as if by calling 'insert(index, value)' in turn
+
+        The final position of every value is worked out first, then each page
+        receiving values is rebuilt once, and the index is updated once.
+        """
+        pairs = list(pairs)
+        if not pairs:
+            return
+        length = self._length
+        # Position of each value in the list as it is when that value is inserted
+        positions = []
+        for count, (index, _) in enumerate(pairs):
+            current = length + count
+            if index < 0:
+                index = max(index + current, 0)
+            positions.append(min(index, current))
+        # Diffs are usually applied from the top or from the bottom:
+        # those orders need no work to find where the values end up.
+        if all(a < b for a, b in pairwise(positions)):
+            # Later insertions never land before earlier ones
+            final = positions
+            order = range(len(pairs))
+        elif all(a >= b for a, b in pairwise(positions)):
+            # Each insertion lands before all the earlier ones
+            final = [position + len(pairs) - 1 - k for k, position in enumerate(positions)]
+            order = range(len(pairs) - 1, -1, -1)
+        else:
+            final = self._final_positions(positions)
+            order = sorted(range(len(pairs)), key=final.__getitem__)
+        # Each value goes before the original item which follows it in the final list:
+        # group the values by the page holding that item.
+        groups = {}
+        sizes = self._index.sizes
+        page_number = offset = 0
+        for rank, k in enumerate(order):
+            original = final[k] - rank
+            while original >= offset + sizes[page_number] and page_number < len(sizes) - 1:
+                offset += sizes[page_number]
+                page_number += 1
+            groups.setdefault(page_number, []).append((original - offset, pairs[k][1]))
+        new_pages = []
+        new_sizes = []
+        for page_number, page in enumerate(self.pages):
+            if page_number not in groups:
+                new_pages.append(page)
+                new_sizes.append(sizes[page_number])
+                continue
+            group = groups[page_number]
+            if len(group) <= 8:
+                # A few values are cheaper to insert in place, last one first
+                merged = self._writable(page_number)
+                for page_index, value in reversed(group):
+                    merged.insert(page_index, value)
+                if len(merged) <= self.max_pagesize:
+                    new_pages.append(page)
+                    new_sizes.append(len(merged))
+                    continue
+            else:
+                data = page.data
+                merged = []
+                previous = 0
+                for page_index, value in group:
+                    merged.extend(data[previous: page_index])
+                    merged.append(value)
+                    previous = page_index
+                merged.extend(data[previous:])
+            parts = -(-len(merged) // self.pagesize) if len(merged) > self.max_pagesize else 1
+            chunk = -(-len(merged) // parts)
+            for start in range(0, len(merged), chunk):
+                piece = merged[start: start + chunk]
+                if self.page_class is not list:
+                    piece = self.page_class(piece)
+                new_pages.append(self._new_page(piece))
+                new_sizes.append(len(piece))
+        page_count = len(self.pages)
+        self.pages[:] = new_pages
+        self._spliced(0, page_count, new_sizes)
+
+    @staticmethod
+    def _final_positions(positions):
+        """Where each of a series of insertions at the given positions ends up, once all are done
+
+        The items present after insertion k keep their order, and take the positions
+        not taken by later insertions: walking backwards, item k goes into
+        the positions[k]-th position not yet taken.
+        """
+        taken = []
+        final = [0] * len(positions)
+        for k in range(len(positions) - 1, -1, -1):
+            position = positions[k]
+            # Find how many taken positions come before it: there are
+            # taken[i] - i free positions before taken[i].
+            low, high = 0, len(taken)
+            while low < high:
+                middle = (low + high) // 2
+                if taken[middle] - middle <= position:
+                    low = middle + 1
+                else:
+                    high = middle
+            final[k] = position + low
+            taken.insert(low, final[k])
+        return final
+
+    def cursor(self, position=0):
+        """Return a PagedListCursor placed at the given position"""
+        return PagedListCursor(self, position)
+
+    def append(self, value):
+        last_page = len(self.pages) - 1
+        if self._index.sizes[last_page] >= self.pagesize:
+            self.pages.append(self._new_page(self.page_class([value])))
+            self._spliced(last_page + 1, last_page + 1, [1])
+            return
+        self._writable(last_page).append(value)
+        self._resized(last_page, 1)
+
+    def extend(self, values):
+        """Append all values, filling the last page up to pagesize, then adding whole new pages"""
+        if values is self:
+            values = list(values)
+        last_page = len(self.pages) - 1
+        room = max(self.pagesize - self._index.sizes[last_page], 0)
+        if _is_sliceable(values):
+            head = values[:room]
+            start = room
+        else:
+            # The iterator is left past the head items
+            values = iter(values)
+            head = list(islice(values, room))
+            start = 0
+        if len(head):
+            self._writable(last_page).extend(head)
+        new_pages = [self._new_page(chunk) for chunk in self._chunks(values, start)]
+        if not new_pages:
+            if len(head):
+                self._resized(last_page, len(head))
+            return
+        self.pages.extend(new_pages)
+        self._spliced(
+            last_page, last_page + 1,
+            [len(self.pages[last_page].data)] + [len(page.data) for page in new_pages],
+        )
+
+    # Deque-style use: the first and last pages grow by whole new pages
+    # and are dropped once emptied, instead of being rebalanced. Each
+    # operation costs O(log pages) for the page index, plus shifting the
+    # items of the first page (a C-level memmove of up to pagesize
+    # pointers, for list pages) on the left side.
+
+    def appendleft(self, value):
+        if self._index.sizes[0] >= self.pagesize:
+            self.pages.insert(0, self._new_page(self.page_class([value])))
+            self._spliced(0, 0, [1])
+            return
+        self._writable(0).insert(0, value)
+        self._resized(0, 1)
+
+    def extendleft(self, values):
+        """Prepend the values one by one, as deque.extendleft: they end up in reverse order"""
+        items = list(values)
+        if not items:
+            return
+        items.reverse()
+        room = max(self.pagesize - self._index.sizes[0], 0)
+        head = items[max(len(items) - room, 0):]
+        if head:
+            self._writable(0)[:0] = head if self.page_class is list else self.page_class(head)
+            self._resized(0, len(head))
+        rest = items[:len(items) - len(head)]
+        if not rest:
+            return
+        # Whole pages, the partial one (if any) going first
+        first = len(rest) % self.pagesize or self.pagesize
+        chunks = [rest[:first]] + [
+            rest[start: start + self.pagesize] for start in range(first, len(rest), self.pagesize)
+        ]
+        if self.page_class is not list:
+            chunks = [self.page_class(chunk) for chunk in chunks]
+        new_pages = [self._new_page(chunk) for chunk in chunks]
+        self.pages[0:0] = new_pages
+        self._spliced(0, 0, [len(chunk) for chunk in chunks])
+
+    def pop(self, index=-1):
+        length = self._length
+        if not length:
+            raise IndexError(f"pop from empty {self.__class__.__name__}")
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError(f"{self.__class__.__name__} index out of range")
+        if index == length - 1 and self._index.sizes[-1]:
+            # The usual case needs no index lookup
+            page_number = len(self.pages) - 1
+            page_index = self._index.sizes[-1] - 1
+        else:
+            page_number, page_index = self._get_indices(index)
+        value = self._writable(page_number).pop(page_index)
+        self._resized(page_number, -1)
+        if not self._index.sizes[page_number] and len(self.pages) > 1:
+            del self.pages[page_number]
+            self._spliced(page_number, page_number + 1, [])
+        elif 0 < page_number < len(self.pages) - 1:
+            self._rebalance(page_number)
+        return value
+
+    def popleft(self):
+        if not self._index.sizes[0]:
+            # Only an empty list (or one emptied by hand) has no item in its first page
+            return self.pop(0)
+        value = self._writable(0).pop(0)
+        self._resized(0, -1)
+        if not self._index.sizes[0] and len(self.pages) > 1:
+            del self.pages[0]
+            self._spliced(0, 1, [])
+        return value
+
+    # Whole-list reordering: pages are moved or rebuilt at once,
+    # instead of going through item by item access.
+
+    def reverse(self):
+        for page_number in range(len(self.pages)):
+            self._writable(page_number).reverse()
+        self.pages.reverse()
+        self._spliced(0, len(self.pages), self._index.sizes[::-1])
+
+    def sort(self, key=None, reverse=False):
+        """Sort the list in place, stably — with the same arguments as list.sort
+
+        All items are gathered into a single list for the sort, then split
+        into fresh pages of pagesize items.
+        """
+        if len(self.pages) > 1:
+            items = self._read_span(0, 0, len(self.pages) - 1, self._index.sizes[-1])
+        else:
+            items = self.pages[0].data[:]
+        if not isinstance(items, list):
+            items = list(items)
+        items.sort(key=key, reverse=reverse)
+        new_pages = [self._new_page(chunk) for chunk in self._chunks(items)]
+        if not new_pages:
+            new_pages = [self._new_page(self.page_class())]
+        page_count = len(self.pages)
+        self.pages[:] = new_pages
+        self._spliced(0, page_count, [len(page.data) for page in new_pages])
+
+    def rotate(self, n=1):
+        """Rotate the list n steps to the right (to the left, if n is negative), as deque.rotate
+
+        Whole pages are moved: only the page holding the new first item is split.
+        """
+        length = self._length
+        if not length or not n % length:
+            return
+        page_number, page_index = self._get_indices(length - n % length)
+        sizes = self._index.sizes
+        new_pages = self.pages[page_number:] + self.pages[:page_number]
+        new_sizes = sizes[page_number:] + sizes[:page_number]
+        if page_index:
+            data = self.pages[page_number].data
+            new_pages[0] = self._new_page(data[page_index:])
+            new_sizes[0] -= page_index
+            new_pages.append(self._new_page(data[:page_index]))
+            new_sizes.append(page_index)
+        page_count = len(self.pages)
+        self.pages[:] = new_pages
+        self._spliced(0, page_count, new_sizes)
+        # The split page pieces may have become too small
+        self._rebalance(len(self.pages) - 1)
+        self._rebalance(0)
+
+    def _rebalance(self, page_number):
+        """Split or merge the given page if it is past the page size limits
+
+        Returns True if the page layout was changed.
+        """
+        if page_number >= len(self.pages):
+            return False
+        size = self._index.sizes[page_number]
+        if size > self.max_pagesize:
+            self._split_page(page_number)
+        elif size < self.min_pagesize and len(self.pages) > 1:
+            self._merge_page(page_number)
+        else:
+            return False
+        return True
+
+    def _split_page(self, page_number):
+        data = self._writable(page_number)
+        size = len(data)
+        chunk = -(-size // -(-size // self.pagesize))
+        new_pages = [
+            self._new_page(data[start: start + chunk]) for start in range(chunk, size, chunk)
+        ]
+        del data[chunk:]
+        self.pages[page_number + 1: page_number + 1] = new_pages
+        self._spliced(
+            page_number, page_number + 1, [chunk] + [len(page.data) for page in new_pages]
+        )
+
+    def _merge_page(self, page_number):
+        left = page_number if page_number + 1 < len(self.pages) else page_number - 1
+        left_data = self._writable(left)
+        right_data = self.pages[left + 1].data
+        total = len(left_data) + len(right_data)
+        if total <= self.max_pagesize:
+            left_data.extend(right_data)
+            del self.pages[left + 1]
+            self._spliced(left, left + 2, [total])
+            return
+        # Too many items for a single page: borrow from the neighbour instead.
+        right_data = self._writable(left + 1)
+        half = total // 2
+        moved = half - len(left_data)
+        if moved > 0:
+            left_data.extend(right_data[:moved])
+            del right_data[:moved]
+        else:
+            right_data[:0] = left_data[half:]
+            del left_data[half:]
+        self._index.add(left, moved)
+        self._index.add(left + 1, -moved)
+        self._version += 1
+        if self.debug:
+            self._check_consistency()
+
+
+class PagedListCursor:
+    """A position in a PagedList which remembers the page it lies in.
+
+    Reading, writing, inserting or deleting items at the cursor, and moving
+    it by small amounts, work straight on the remembered page, without
+    locating the position from scratch each time — which suits editing
+    patterns where the position drifts slowly, like typing into a buffer.
+
+    If the list is changed other than through this cursor, the cursor
+    keeps its numeric position (clamped to the list length) and locates
+    it again on its next use.
+    """
+
+    __slots__ = ("_list", "_page_number", "_page_index", "_position", "_version")
+
+    def __init__(self, paged_list, position=0):
+        self._list = paged_list
+        self.seek(position)
+
+    @property
+    def position(self):
+        self._sync()
+        return self._position
+
+    def seek(self, position):
+        length = len(self._list)
+        if position < 0:
+            position += length
+        if not 0 <= position <= length:
+            raise IndexError("cursor position out of range")
+        self._position = position
+        self._page_number, self._page_index = self._list._get_indices(position)
+        self._version = self._list._version
+
+    def _sync(self):
+        if self._version != self._list._version:
+            self.seek(min(self._position, len(self._list)))
+
+    def _settle(self):
+        """Move a cursor sitting at the end of a page to the start of the next one"""
+        sizes = self._list._index.sizes
+        last_page = len(sizes) - 1
+        while self._page_index >= sizes[self._page_number] and self._page_number < last_page:
+            self._page_index -= sizes[self._page_number]
+            self._page_number += 1
+
+    def move(self, delta):
+        """Move the cursor by delta positions (backwards if negative)"""
+        self._sync()
+        position = self._position + delta
+        if not 0 <= position <= len(self._list):
+            raise IndexError("cursor position out of range")
+        if abs(delta) > self._list.pagesize:
+            self.seek(position)
+            return
+        sizes = self._list._index.sizes
+        self._page_index += delta
+        while self._page_index < 0:
+            self._page_number -= 1
+            self._page_index += sizes[self._page_number]
+        self._settle()
+        self._position = position
+
+    def read(self):
+        """Return the item at the cursor"""
+        self._sync()
+        self._settle()
+        try:
+            return self._list.pages[self._page_number].data[self._page_index]
+        except IndexError:
+            raise IndexError("cursor is past the end of the list") from None
+
+    def write(self, value):
+        """Replace the item at the cursor"""
+        self._sync()
+        self._settle()
+        paged_list = self._list
+        if self._position >= len(paged_list):
+            raise IndexError("cursor is past the end of the list")
+        paged_list._writable(self._page_number)[self._page_index] = value
+        paged_list._resized(self._page_number, 0)
+
+    def insert(self, value):
+        """Insert value at the cursor, and move the cursor past it"""
+        self._sync()
+        paged_list = self._list
+        paged_list._writable(self._page_number).insert(self._page_index, value)
+        paged_list._resized(self._page_number, 1)
+        self._position += 1
+        self._page_index += 1
+        self._after_change(paged_list._rebalance(self._page_number))
+
+    def delete(self):
+        """Delete the item at the cursor. The cursor is left at the following item"""
+        self._sync()
+        self._settle()
+        paged_list = self._list
+        if self._position >= len(paged_list):
+            raise IndexError("cursor is past the end of the list")
+        del paged_list._writable(self._page_number)[self._page_index]
+        paged_list._resized(self._page_number, -1)
+        self._after_change(paged_list._rebalance(self._page_number))
+
+    def _after_change(self, rebalanced):
+        if rebalanced:
+            self.seek(self._position)
+        else:
+            self._version = self._list._version
 
+    def __repr__(self):
+        return f"<{self.__class__.__name__} at {self._position}>"
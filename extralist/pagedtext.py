@@ -0,0 +1,242 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+from .pagedlist import PagedList
+
+
+def _text(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, _StrPage):
+        return value.text
+    # Other iterables hold items: each one must be a single character
+    return "".join(map(_check_char, value))
+
+
+def _check_char(value):
+    if not isinstance(value, str) or len(value) != 1:
+        raise TypeError(f"PagedText items are single characters, not {value!r}")
+    return value
+
+
+class _StrPage:
+    """A mutable str, holding a PagedText page.
+
+    Changes build a new str, costing O(pagesize) — like the memmove of a list
+    page — while the text takes as little memory as a plain str.
+    Only the list methods used by PagedList are provided.
+    """
+    __slots__ = ("text",)
+
+    def __init__(self, text=""):
+        self.text = _text(text)
+
+    def __len__(self):
+        return len(self.text)
+
+    def __iter__(self):
+        return iter(self.text)
+
+    def __reversed__(self):
+        return reversed(self.text)
+
+    def __contains__(self, value):
+        return value in self.text
+
+    def _slice(self, index):
+        if isinstance(index, slice):
+            return index
+        index = range(len(self.text))[index]
+        return slice(index, index + 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return _StrPage(self.text[index])
+        return self.text[index]
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            value = _check_char(value)
+        index = self._slice(index)
+        start, stop, step = index.indices(len(self.text))
+        if step != 1:
+            chars = list(self.text)
+            chars[index] = _text(value)
+            self.text = "".join(chars)
+            return
+        self.text = self.text[:start] + _text(value) + self.text[max(start, stop):]
+
+    def __delitem__(self, index):
+        index = self._slice(index)
+        if index.step not in (None, 1):
+            chars = list(self.text)
+            del chars[index]
+            self.text = "".join(chars)
+            return
+        self[index] = ""
+
+    def insert(self, index, value):
+        self[index:index] = _check_char(value)
+
+    def append(self, value):
+        self.text += _check_char(value)
+
+    def extend(self, values):
+        self.text += _text(values)
+
+    def pop(self, index=-1):
+        value = self.text[index]
+        del self[index]
+        return value
+
+    def reverse(self):
+        self.text = self.text[::-1]
+
+    def count(self, value):
+        return self.text.count(value)
+
+    def index(self, value, start=0, stop=None):
+        return self.text.index(value, start, len(self.text) if stop is None else stop)
+
+    def __repr__(self):
+        return f"_StrPage({self.text!r})"
+
+
+class PagedText(PagedList):
+    """Rope-like PagedList for editing large str or bytes buffers.
+
+    Text is split into str pages (or bytearray pages, for bytes input),
+    so inserting or deleting text costs O(pagesize) instead of O(n),
+    and memory use stays close to that of a plain str or bytes.
+
+    Slices are str (or bytes), 'find', 'index' and 'count' look for substrings
+    even across page boundaries, and 'str(text)' (or 'bytes(text)') joins
+    all pages at once. Items are single characters (or, for bytes, ints).
+    """
+
+    def __init__(self, text="", pagesize=4096, page_class=None, max_pagesize=None,
+                 min_pagesize=None):
+        if page_class is None:
+            page_class = _StrPage if isinstance(text, str) else bytearray
+        self._reset(pagesize, page_class, max_pagesize, min_pagesize)
+        self._fill(text)
+
+    @property
+    def binary(self):
+        return self.page_class is not _StrPage
+
+    def _raw(self, data):
+        return data if self.binary else data.text
+
+    def _join(self, pieces):
+        return (b"" if self.binary else "").join(pieces)
+
+    def _coerce(self, sub):
+        if not self.binary:
+            if not isinstance(sub, str):
+                raise TypeError(f"must be str, not {type(sub).__name__}")
+            return sub
+        return bytes([sub]) if isinstance(sub, int) else bytes(sub)
+
+    def _read_span(self, lower_page, start_index, upper_page, end_index):
+        pages = self.pages
+        return self._join(
+            [self._raw(pages[lower_page].data)[start_index:]] +
+            [self._raw(pages[number].data) for number in range(lower_page + 1, upper_page)] +
+            [self._raw(pages[upper_page].data)[:end_index]]
+        )
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or self.slice_to_paged:
+            return super().__getitem__(index)
+        start, stop, step = index.indices(self._length)
+        if step != 1:
+            positions = range(start, stop, step)
+            if not positions:
+                return self._join(())
+            low, high = sorted((positions[0], positions[-1]))
+            return self[low: high + 1][::step]
+        if stop <= start:
+            return self._join(())
+        lower_page, start_index, _, upper_page, end_index = self._get_slice_interval(index)
+        if lower_page == upper_page:
+            return self._join([self._raw(self.pages[lower_page].data)[start_index:end_index]])
+        return self._read_span(lower_page, start_index, upper_page, end_index)
+
+    def _bounds(self, start, end):
+        # As str methods, an empty match is not found past the end
+        beyond = (start if start >= 0 else start + self._length) > self._length
+        start, end, _ = slice(start, end).indices(self._length)
+        return start, end, beyond
+
+    def find(self, sub, start=0, end=None):
+        """Lowest index where sub is found within text[start:end], or -1 — as str.find"""
+        sub = self._coerce(sub)
+        start, end, beyond = self._bounds(start, end)
+        if not sub:
+            return start if start <= end and not beyond else -1
+        size = len(sub)
+        if end - start < size:
+            return -1
+        page_number, page_index = self._get_indices(start)
+        offset = start - page_index
+        # The last size - 1 items before the current page: matches crossing
+        # into the page are looked for in that tail joined with the page head.
+        tail = self._join(())
+        while page_number < len(self.pages) and offset < end:
+            raw = self._raw(self.pages[page_number].data)
+            if tail:
+                position = (tail + raw[:size - 1]).find(sub)
+                if position >= 0:
+                    position += offset - len(tail)
+                    return position if position + size <= end else -1
+            position = raw.find(sub, page_index, end - offset)
+            if position >= 0:
+                return offset + position
+            if size > 1:
+                tail = (tail + raw[max(page_index, len(raw) - size + 1):])[-(size - 1):]
+            offset += len(raw)
+            page_number += 1
+            page_index = 0
+        return -1
+
+    def index(self, sub, start=0, end=None):
+        position = self.find(sub, start, end)
+        if position < 0:
+            raise ValueError("substring not found")
+        return position
+
+    def count(self, sub, start=0, end=None):
+        """Number of non-overlapping occurrences of sub in text[start:end] — as str.count"""
+        sub = self._coerce(sub)
+        start, end, beyond = self._bounds(start, end)
+        if not sub:
+            return 0 if beyond else max(end - start, -1) + 1
+        total = 0
+        position = self.find(sub, start, end)
+        while position >= 0:
+            total += 1
+            position = self.find(sub, position + len(sub), end)
+        return total
+
+    def __contains__(self, sub):
+        return self.find(sub) >= 0
+
+    def insert_str(self, position, text):
+        """Insert a whole str (or bytes) at the given position"""
+        self[position:position] = self._coerce(text)
+
+    def delete_range(self, start, stop):
+        del self[start:stop]
+
+    def __str__(self):
+        if self.binary:
+            return repr(self)
+        return "".join(page.data.text for page in self.pages)
+
+    def __bytes__(self):
+        if not self.binary:
+            raise TypeError(f"{self.__class__.__name__} holds str: use str() on it")
+        return b"".join(page.data for page in self.pages)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self[:]!r})"
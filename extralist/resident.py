@@ -0,0 +1,86 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+from collections import OrderedDict
+from itertools import count
+
+from .pagedlist import PagedList, _Page, _rebuild
+
+
+class _ResidentPage(_Page):
+    """A page whose data may be moved out of memory by its owner list.
+
+    'resident' holds the data while it is in memory, and is None
+    while only the owner list can bring it back.
+    """
+    __slots__ = ("owner", "serial", "resident", "__weakref__")
+
+
+class _ResidentPagedList(PagedList):
+    """Base for the PagedLists keeping only some of their pages in memory.
+
+    Subclasses set 'page_type' and implement '_touch', called on every
+    page access, to decide which pages stay resident. Pages handed out
+    for writing are pinned until the next bookkeeping update, and must
+    not be moved out of memory meanwhile.
+    """
+
+    page_type = _ResidentPage
+
+    def _reset(self, *args, **kw):
+        # Maps page serial numbers to the subclass bookkeeping for
+        # the resident pages, least recently used first.
+        self._resident = OrderedDict()
+        # Pages handed out for writing since the last bookkeeping update:
+        # their data may still be changed in place, so they can't leave memory.
+        self._pinned = set()
+        self._serials = count()
+        super()._reset(*args, **kw)
+
+    def _blank_page(self):
+        """New page owned by this list, with no data yet"""
+        page = self.page_type()
+        page.refs = None
+        page.owner = self
+        page.serial = next(self._serials)
+        page.resident = None
+        return page
+
+    def _new_page(self, chunk):
+        page = self._blank_page()
+        page.data = chunk
+        return page
+
+    def _touch(self, page):
+        raise NotImplementedError
+
+    def _writable(self, page_number):
+        data = super()._writable(page_number)
+        self._pinned.add(self.pages[page_number].serial)
+        return data
+
+    def _release(self):
+        self._pinned.clear()
+
+    def _resized(self, page_number, amount):
+        super()._resized(page_number, amount)
+        self._release()
+
+    def _spliced(self, start, stop, sizes):
+        super()._spliced(start, stop, sizes)
+        self._release()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._release()
+
+    def reverse(self):
+        # Each page is unpinned once reversed, so that it can leave
+        # memory before the next one is brought in
+        for page_number in range(len(self.pages)):
+            self._writable(page_number).reverse()
+            self._release()
+        self.pages.reverse()
+        self._spliced(0, len(self.pages), self._index.sizes[::-1])
+
+    def __reduce__(self):
+        return (_rebuild, (self.__class__, list(self), self._options()), self._settings())
@@ -0,0 +1,178 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+import bisect
+
+from .pagedlist import PagedList
+
+
+class SortedPagedList(PagedList):
+    """Sorted sequence stored in PagedList pages.
+
+    Items are looked up in two levels: a bisection over the largest item
+    of each page finds the page, and a bisection inside that page finds
+    the position. As pages are split once they grow past 'max_pagesize',
+    'add' and 'discard' cost about O(log n + pagesize), instead of
+    the O(n) of 'bisect.insort' on a plain list.
+
+    Items are placed by their ordering, so the methods which would put
+    an item at an arbitrary position (insert, append, extend, appendleft,
+    extendleft, item assignment, reverse, sort, rotate, cursors, map_pages)
+    raise NotImplementedError. Deleting items by index or slice works as usual.
+    'min_pagesize' is at least 1, so that emptied pages are always merged away.
+    """
+
+    def _reset(self, pagesize, page_class, max_pagesize=None, min_pagesize=None):
+        # An empty page has no largest item to bisect over: pages
+        # are merged away as soon as they are emptied
+        if min_pagesize is None:
+            min_pagesize = pagesize // 4
+        super()._reset(pagesize, page_class, max_pagesize, max(min_pagesize, 1))
+
+    def _reindex(self):
+        super()._reindex()
+        self._refresh_maxes()
+
+    @classmethod
+    def _from_pages(cls, pages, sizes=None, **options):
+        self = super()._from_pages(pages, sizes, **options)
+        self._refresh_maxes()
+        return self
+
+    def _fill(self, sequence):
+        super()._fill(sorted(sequence if sequence is not None else ()))
+
+    @classmethod
+    async def afrom(cls, async_iterable, **options):
+        # Items may arrive in any order: all are needed before sorting
+        return cls([item async for item in async_iterable], **options)
+
+    def _refresh_maxes(self, start=0, stop=None):
+        """Update the largest item of each page in pages[start:stop]"""
+        if start == 0 and stop is None:
+            self._maxes = [None] * len(self.pages)
+        stop = len(self.pages) if stop is None else min(stop, len(self.pages))
+        for page_number in range(start, stop):
+            data = self.pages[page_number].data
+            self._maxes[page_number] = data[-1] if len(data) else None
+
+    def _resized(self, page_number, amount):
+        super()._resized(page_number, amount)
+        self._refresh_maxes(page_number, page_number + 1)
+
+    def _spliced(self, start, stop, sizes):
+        sizes = list(sizes)
+        super()._spliced(start, stop, sizes)
+        self._maxes[start:stop] = [None] * len(sizes)
+        self._refresh_maxes(start, start + len(sizes))
+
+    def _merge_page(self, page_number):
+        super()._merge_page(page_number)
+        # Borrowing items between pages does not go through _spliced
+        self._refresh_maxes(max(page_number - 1, 0), page_number + 2)
+
+    def _find_page(self, value, right=False):
+        """Page number where value belongs — or len(self.pages) if past the last item"""
+        if not self._length:
+            # The only page is empty, and has no maximum to compare to
+            return len(self.pages)
+        return (bisect.bisect_right if right else bisect.bisect_left)(self._maxes, value)
+
+    def add(self, value):
+        """Add value to the list, keeping it sorted"""
+        page_number = min(self._find_page(value), len(self.pages) - 1)
+        bisect.insort(self._writable(page_number), value)
+        self._resized(page_number, 1)
+        self._rebalance(page_number)
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    def discard(self, value):
+        """Remove one occurrence of value, if present"""
+        page_number = self._find_page(value)
+        if page_number >= len(self.pages):
+            return
+        data = self.pages[page_number].data
+        page_index = bisect.bisect_left(data, value)
+        if page_index >= len(data) or data[page_index] != value:
+            return
+        del self._writable(page_number)[page_index]
+        self._resized(page_number, -1)
+        self._rebalance(page_number)
+
+    def remove(self, value):
+        length = self._length
+        self.discard(value)
+        if self._length == length:
+            raise ValueError(f"{value!r} is not in {self.__class__.__name__}")
+
+    def bisect_left(self, value):
+        page_number = self._find_page(value)
+        if page_number >= len(self.pages):
+            return self._length
+        return self._index.offset(page_number) + bisect.bisect_left(
+            self.pages[page_number].data, value
+        )
+
+    def bisect_right(self, value):
+        page_number = self._find_page(value, right=True)
+        if page_number >= len(self.pages):
+            return self._length
+        return self._index.offset(page_number) + bisect.bisect_right(
+            self.pages[page_number].data, value
+        )
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True)):
+        """Iterate over the items between minimum and maximum
+
+        A bound of None is unbounded. 'inclusive' tells whether items
+        equal to each bound are included.
+        """
+        if minimum is None:
+            start = 0
+        else:
+            start = self.bisect_left(minimum) if inclusive[0] else self.bisect_right(minimum)
+        if maximum is None:
+            stop = self._length
+        else:
+            stop = self.bisect_right(maximum) if inclusive[1] else self.bisect_left(maximum)
+        if start >= stop:
+            return
+        version = self._version
+        page_number, page_index = self._get_indices(start)
+        remaining = stop - start
+        while remaining > 0:
+            data = self.pages[page_number].data
+            chunk = data[page_index: page_index + remaining]
+            yield from chunk
+            self._check_version(version)
+            remaining -= len(chunk)
+            page_number += 1
+            page_index = 0
+
+    def index(self, value, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(self._length)
+        position = max(self.bisect_left(value), start)
+        if position < min(self.bisect_right(value), stop):
+            return position
+        raise ValueError(f"{value!r} is not in {self.__class__.__name__}")
+
+    def __contains__(self, value):
+        return self.bisect_left(value) < self.bisect_right(value)
+
+    def count(self, value):
+        return self.bisect_right(value) - self.bisect_left(value)
+
+    def _unordered(self, *args, **kw):
+        raise NotImplementedError(f"{self.__class__.__name__} keeps its items sorted: use 'add'")
+
+    insert = insert_many = append = extend = appendleft = extendleft = _unordered
+    reverse = sort = rotate = __setitem__ = cursor = map_pages = _unordered
+
+    def __iadd__(self, values):
+        self.update(values)
+        return self
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({list(self)!r})"
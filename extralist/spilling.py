@@ -0,0 +1,168 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+import os
+import pickle
+import shutil
+import tempfile
+import weakref
+
+from .resident import _ResidentPage, _ResidentPagedList
+
+
+class _SpilledPage(_ResidentPage):
+    """A page whose data may live in a spill file instead of in memory.
+
+    'resident' is None while the data is only available in the page file.
+    """
+    __slots__ = ("dirty",)
+
+    @property
+    def data(self):
+        if self.resident is None:
+            self.owner._load(self)
+        else:
+            self.owner._touch(self)
+        return self.resident
+
+    @data.setter
+    def data(self, value):
+        self.resident = value
+        self.dirty = True
+        self.owner._touch(self)
+
+    @property
+    def path(self):
+        return os.path.join(self.owner._directory, f"page-{self.serial}")
+
+    def __del__(self):
+        super().__del__()
+        try:
+            os.remove(self.path)
+        except (OSError, AttributeError):
+            pass
+
+
+class SpillingPagedList(_ResidentPagedList):
+    """PagedList keeping at most 'max_resident_pages' pages in memory.
+
+    Other pages are pickled into one file per page, in a temporary
+    directory (created inside 'spill_dir', if given), and loaded back
+    on access. The least recently used pages are evicted first, and
+    only pages changed since they were last loaded are written back.
+
+    Use 'cache_stats' to check the hit and miss counts when sizing
+    the cache. Calling 'close' removes the spill files right away —
+    otherwise they are removed when the list is garbage collected.
+
+    Copies and paged slices are new SpillingPagedLists with their own
+    spill files.
+    """
+
+    page_type = _SpilledPage
+
+    def __init__(self, sequence=None, pagesize=1000, page_class=list, max_pagesize=None,
+                 min_pagesize=None, max_resident_pages=16, spill_dir=None):
+        self._reset(pagesize, page_class, max_pagesize, min_pagesize, max_resident_pages, spill_dir)
+        self._fill(sequence)
+
+    def _reset(self, pagesize, page_class, max_pagesize=None, min_pagesize=None,
+               max_resident_pages=16, spill_dir=None):
+        if max_resident_pages < 2:
+            raise ValueError("max_resident_pages must be at least 2")
+        self.max_resident_pages = max_resident_pages
+        self.spill_dir = spill_dir
+        self._directory = tempfile.mkdtemp(prefix="extralist-", dir=spill_dir)
+        self._finalizer = weakref.finalize(self, shutil.rmtree, self._directory, True)
+        self._cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "writebacks": 0}
+        super()._reset(pagesize, page_class, max_pagesize, min_pagesize)
+
+    def _options(self):
+        options = super()._options()
+        options["max_resident_pages"] = self.max_resident_pages
+        options["spill_dir"] = self.spill_dir
+        return options
+
+    # '_resident' maps page serial numbers to weak references to the pages
+    def _touch(self, page):
+        resident = self._resident
+        if page.serial in resident:
+            resident.move_to_end(page.serial)
+            self._cache_stats["hits"] += 1
+            return
+        resident[page.serial] = weakref.ref(page)
+        self._trim(keep=page.serial)
+
+    def _load(self, page):
+        with open(page.path, "rb") as file_:
+            page.resident = pickle.load(file_)
+        page.dirty = False
+        self._cache_stats["misses"] += 1
+        self._resident[page.serial] = weakref.ref(page)
+        self._trim(keep=page.serial)
+
+    def _evict(self, page):
+        if page.dirty:
+            with open(page.path, "wb") as file_:
+                pickle.dump(page.resident, file_, pickle.HIGHEST_PROTOCOL)
+            page.dirty = False
+            self._cache_stats["writebacks"] += 1
+        page.resident = None
+        self._cache_stats["evictions"] += 1
+
+    def _trim(self, keep=None):
+        resident = self._resident
+        excess = len(resident) - self.max_resident_pages
+        if excess <= 0:
+            return
+        for serial, page_ref in list(resident.items()):
+            if excess <= 0:
+                break
+            page = page_ref()
+            if page is not None:
+                if serial == keep or serial in self._pinned:
+                    continue
+                self._evict(page)
+            del resident[serial]
+            excess -= 1
+
+    def _writable(self, page_number):
+        data = super()._writable(page_number)
+        self.pages[page_number].dirty = True
+        return data
+
+    def _release(self):
+        super()._release()
+        self._trim()
+
+    def copy(self):
+        return self.__class__(iter(self), **self._options())
+
+    __copy__ = copy
+
+    def _paged_slice(self, lower_page, start_index, upper_page, end_index):
+        return self.__class__(
+            self._iter_span(lower_page, start_index, upper_page, end_index), **self._options()
+        )
+
+    def _iter_span(self, lower_page, start_index, upper_page, end_index):
+        yield from self.pages[lower_page].data[start_index:]
+        for page_number in range(lower_page + 1, upper_page):
+            yield from self.pages[page_number].data
+        yield from self.pages[upper_page].data[:end_index]
+
+    def cache_stats(self):
+        """Return a dict with the page cache hit, miss, eviction and write-back counts
+
+        'resident_pages' tells how many pages are currently in memory.
+        """
+        stats = dict(self._cache_stats)
+        stats["resident_pages"] = sum(
+            1 for page_ref in self._resident.values() if page_ref() is not None
+        )
+        return stats
+
+    def close(self):
+        """Remove the spill files. The list can't be used afterwards"""
+        self.pages.clear()
+        self._resident.clear()
+        self._finalizer()
@@ -2,12 +2,15 @@
 """
 
 import struct
+from functools import partial
 
 try:
     from collections.abc import MutableSequence
 except ImportError:
     from collections import MutableSequence
 
+from .ingest import _map_blocks, _pack_block, _read_blocks
+
 
 class _StructItem(object):
     """
@@ -100,6 +103,31 @@ class StructSequence(MutableSequence):
         self.field_names = field_names
         self.data = bytearray()
 
+    @classmethod
+    def from_file(cls, name, field_names, field_desc, fileobj, parse=None, record_size=None,
+                  executor=None, block_size=1 << 20):
+        """Build a StructSequence from the records in a binary file
+
+        Without 'parse', the file holds the packed records themselves,
+        which are copied in blocks of about block_size bytes. Otherwise, 'parse'
+        turns each line (or each record of record_size bytes) into a tuple
+        of field values, and the records are packed block by block — as
+        executor tasks, if an executor is given, such as a ProcessPoolExecutor
+        ('parse' must then be picklable). Blocks are appended in file order.
+        """
+        self = cls(name, field_names, field_desc)
+        if parse is None:
+            blocks = _read_blocks(fileobj, block_size, struct.calcsize(field_desc))
+        else:
+            blocks = _map_blocks(
+                partial(_pack_block, field_desc, parse, record_size),
+                _read_blocks(fileobj, block_size, record_size),
+                executor,
+            )
+        for block in blocks:
+            self.data.extend(block)
+        return self
+
     def __sizeof__(self):
         return struct.calcsize(self.field_desc)
 
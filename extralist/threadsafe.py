@@ -0,0 +1,248 @@
+# Author: João S. O. Bueno
+# License: LGPL v 3.0
+import asyncio
+import inspect
+import threading
+from functools import wraps
+
+from .pagedlist import PagedList, PagedListCursor, _Page, _rebuild
+
+
+class _DirectoryLock:
+    """Readers-writer lock: held by many threads in shared mode, or by one in exclusive mode.
+
+    It is reentrant: a thread already holding it may acquire it again,
+    in the same mode or in shared mode. Waiting writers block new readers,
+    so that writers are not starved.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def acquire_shared(self):
+        local = self._local
+        if getattr(local, "depth", 0):
+            local.depth += 1
+            return
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        local.depth = 1
+        local.exclusive = False
+
+    def acquire_exclusive(self):
+        local = self._local
+        if getattr(local, "depth", 0):
+            if not local.exclusive:
+                raise RuntimeError("A shared lock can't be upgraded to an exclusive one")
+            local.depth += 1
+            return
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = threading.get_ident()
+        local.depth = 1
+        local.exclusive = True
+
+    def release(self):
+        local = self._local
+        local.depth -= 1
+        if local.depth:
+            return
+        with self._condition:
+            if local.exclusive:
+                self._writer = None
+            else:
+                self._readers -= 1
+            self._condition.notify_all()
+
+
+def _shared(method):
+    @wraps(method)
+    def wrapper(self, *args, **kw):
+        lock = self._directory_lock
+        lock.acquire_shared()
+        try:
+            return method(self, *args, **kw)
+        finally:
+            lock.release()
+    return wrapper
+
+
+def _exclusive(method):
+    @wraps(method)
+    def wrapper(self, *args, **kw):
+        lock = self._directory_lock
+        lock.acquire_exclusive()
+        try:
+            return method(self, *args, **kw)
+        finally:
+            lock.release()
+    return wrapper
+
+
+class _LockedPage(_Page):
+    __slots__ = ("lock",)
+
+
+class ThreadSafePagedList(PagedList):
+    """PagedList which can be shared by several threads.
+
+    A readers-writer lock guards the page directory (the pages list and
+    the page index), and each page has a lock of its own:
+
+    - item reads, item assignments and searches hold the directory in
+      shared mode, so they run in parallel, taking only the lock of the
+      page they change: writers on different pages do not wait for
+      each other — which scales with cores on free-threaded Python builds;
+    - anything changing the list length or its page layout holds the
+      directory exclusively.
+
+    Iterators copy one page at a time, holding the locks only for that copy,
+    and raise RuntimeError if the list is resized between pages.
+
+    Public methods not listed as shared below are wrapped to run exclusively,
+    including methods added to PagedList later on. Pages are never shared
+    copy-on-write with other lists: copies and paged slices copy the data.
+    """
+
+    _shared_methods = ("__getitem__", "__contains__", "count", "index", "sum", "min", "max",
+                       "positions", "dump", "map_pages", "reduce_pages")
+
+    def _reset(self, *args, **kw):
+        self._directory_lock = _DirectoryLock()
+        super()._reset(*args, **kw)
+        self.pages.default_factory = self._empty_page
+
+    def _empty_page(self):
+        return self._new_page(self.page_class())
+
+    def _new_page(self, chunk):
+        page = _LockedPage()
+        page.data = chunk
+        page.refs = None
+        page.lock = threading.Lock()
+        return page
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            self._directory_lock.acquire_exclusive()
+            try:
+                return super().__setitem__(index, value)
+            finally:
+                self._directory_lock.release()
+        self._directory_lock.acquire_shared()
+        try:
+            page_number, page_index = self._get_indices(self._normalize_index(index))
+            page = self.pages[page_number]
+            with page.lock:
+                self._writable(page_number)[page_index] = value
+        finally:
+            self._directory_lock.release()
+
+    def _snapshots(self, reverse=False):
+        """Yield a copy of each page data, taken under the page lock"""
+        lock = self._directory_lock
+        version = self._version
+        page_number = len(self.pages) - 1 if reverse else 0
+        while True:
+            lock.acquire_shared()
+            try:
+                self._check_version(version)
+                if not 0 <= page_number < len(self.pages):
+                    return
+                page = self.pages[page_number]
+                with page.lock:
+                    snapshot = page.data[:]
+            finally:
+                lock.release()
+            yield snapshot
+            page_number += -1 if reverse else 1
+
+    def __iter__(self):
+        for snapshot in self._snapshots():
+            yield from snapshot
+
+    def __reversed__(self):
+        for snapshot in self._snapshots(reverse=True):
+            yield from reversed(snapshot)
+
+    async def aiter_pages(self):
+        for snapshot in self._snapshots():
+            yield snapshot
+            await asyncio.sleep(0)
+
+    @_shared
+    def copy(self):
+        pages = []
+        for page in self.pages:
+            with page.lock:
+                pages.append(self._new_page(page.data[:]))
+        return self._from_pages(pages, sizes=self._index.sizes, **self._options())
+
+    __copy__ = copy
+
+    def _paged_slice(self, lower_page, start_index, upper_page, end_index):
+        return self.__class__(
+            self._read_span(lower_page, start_index, upper_page, end_index), **self._options()
+        )
+
+    def cursor(self, position=0):
+        return _LockedCursor(self, position)
+
+    @_shared
+    def __reduce__(self):
+        # Locks can't be pickled: the copy gets locks of its own
+        return (_rebuild, (self.__class__, list(self), self._options()), self._settings())
+
+
+class _LockedCursor(PagedListCursor):
+    """A cursor holding its list directory exclusively while in use"""
+    __slots__ = ()
+
+    @property
+    def position(self):
+        self._list._directory_lock.acquire_exclusive()
+        try:
+            return PagedListCursor.position.fget(self)
+        finally:
+            self._list._directory_lock.release()
+
+
+def _locked_cursor_method(method):
+    @wraps(method)
+    def wrapper(self, *args, **kw):
+        lock = self._list._directory_lock
+        lock.acquire_exclusive()
+        try:
+            return method(self, *args, **kw)
+        finally:
+            lock.release()
+    return wrapper
+
+
+for _name in ("seek", "move", "read", "write", "insert", "delete"):
+    setattr(_LockedCursor, _name, _locked_cursor_method(getattr(PagedListCursor, _name)))
+
+
+_unlocked = {"__iter__", "__reversed__", "__setitem__", "__len__", "copy", "cursor", "aiter_pages"}
+_locked_dunders = {"__getitem__", "__delitem__", "__iadd__", "__contains__"}
+
+for _name in dir(ThreadSafePagedList):
+    if _name in _unlocked or (_name.startswith("_") and _name not in _locked_dunders):
+        continue
+    _method = getattr(ThreadSafePagedList, _name)
+    if not inspect.isfunction(inspect.getattr_static(ThreadSafePagedList, _name)):
+        # Properties, class attributes and classmethods
+        continue
+    _wrapper = _shared if _name in ThreadSafePagedList._shared_methods else _exclusive
+    setattr(ThreadSafePagedList, _name, _wrapper(_method))
+
+del _name, _method, _wrapper
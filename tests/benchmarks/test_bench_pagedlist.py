@@ -0,0 +1,134 @@
+"""PagedList against list and collections.deque, on the basic sequence operations.
+
+Run with: pytest tests/benchmarks/test_bench_pagedlist.py --benchmark-only
+
+Sizes default to 100_000 and 1_000_000 items; set EXTRALIST_BENCH_SIZES
+(comma separated) to change them — e.g. "10000000" for the figures quoted
+in the README. Add --benchmark-json=FILE (or --benchmark-autosave, then
+--benchmark-compare) to keep results for later comparison; "tox run -e bench"
+does the latter.
+"""
+
+import os
+import random
+from collections import deque
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from extralist import PagedList  # noqa: E402
+
+SIZES = [int(size) for size in os.environ.get("EXTRALIST_BENCH_SIZES", "100000,1000000").split(",")]
+PAGESIZES = [1000, 10000]
+OPERATIONS = 2_000
+
+CONTAINERS = {
+    "list": list,
+    "deque": deque,
+    **{
+        f"paged-{pagesize}": (lambda data, pagesize=pagesize: PagedList(data, pagesize))
+        for pagesize in PAGESIZES
+    },
+}
+
+
+@pytest.fixture(params=list(CONTAINERS))
+def container(request):
+    return request.param
+
+
+def _build(container, size):
+    return CONTAINERS[container](range(size))
+
+
+def _fresh(data):
+    """pedantic setup: a new copy for each round of a benchmark changing the data"""
+    return lambda: ((data.copy(),), {})
+
+
+def _indices(count, bound, seed):
+    rng = random.Random(seed)
+    return [rng.randrange(bound) for _ in range(count)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_sequential_delete(benchmark, container, size):
+    data = _build(container, size)
+    position = size // 2
+
+    def run(data):
+        for _ in range(OPERATIONS):
+            del data[position]
+
+    benchmark.extra_info.update(container=container, size=size)
+    benchmark.pedantic(run, setup=_fresh(data), rounds=5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_random_read(benchmark, container, size):
+    data = _build(container, size)
+    indices = _indices(OPERATIONS, size, 0)
+
+    def run():
+        for index in indices:
+            data[index]
+
+    benchmark.extra_info.update(container=container, size=size)
+    benchmark(run)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_random_insert(benchmark, container, size):
+    data = _build(container, size)
+    indices = _indices(OPERATIONS, size, 1)
+
+    def run(data):
+        for index in indices:
+            data.insert(index, None)
+
+    benchmark.extra_info.update(container=container, size=size)
+    benchmark.pedantic(run, setup=_fresh(data), rounds=5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_slice_read(benchmark, container, size):
+    if container == "deque":
+        pytest.skip("deque does not support slicing")
+    data = _build(container, size)
+    starts = _indices(OPERATIONS // 10, size - 1000, 2)
+
+    def run():
+        for start in starts:
+            data[start: start + 1000]
+
+    benchmark.extra_info.update(container=container, size=size)
+    benchmark(run)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_slice_write(benchmark, container, size):
+    if container == "deque":
+        pytest.skip("deque does not support slicing")
+    data = _build(container, size)
+    starts = _indices(OPERATIONS // 10, size - 1000, 3)
+    values = list(range(1500))
+
+    def run(data):
+        for start in starts:
+            data[start: start + 1000] = values
+
+    benchmark.extra_info.update(container=container, size=size)
+    benchmark.pedantic(run, setup=_fresh(data), rounds=5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_iteration(benchmark, container, size):
+    data = _build(container, size)
+
+    def run():
+        for _ in data:
+            pass
+
+    benchmark.extra_info.update(container=container, size=size)
+    benchmark.pedantic(run, rounds=3)
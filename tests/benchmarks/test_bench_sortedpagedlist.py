@@ -0,0 +1,57 @@
+"""SortedPagedList against bisect.insort on a plain list.
+
+Run with: pytest tests/benchmarks --benchmark-only
+"""
+
+import bisect
+import random
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from extralist import SortedPagedList  # noqa: E402
+
+SIZES = [10_000, 1_000_000]
+INSERTS = 2_000
+
+
+def _values(count, seed):
+    random.seed(seed)
+    return [random.random() for _ in range(count)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_insort_into_list(benchmark, size):
+    initial = sorted(_values(size, 0))
+    new_values = _values(INSERTS, 1)
+
+    def run(data):
+        for value in new_values:
+            bisect.insort(data, value)
+
+    benchmark.pedantic(run, setup=lambda: ((list(initial),), {}), rounds=5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_add_to_sorted_paged_list(benchmark, size):
+    initial = SortedPagedList(_values(size, 0))
+    new_values = _values(INSERTS, 1)
+
+    def run(data):
+        for value in new_values:
+            data.add(value)
+
+    benchmark.pedantic(run, setup=lambda: ((initial.copy(),), {}), rounds=5)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_bisect_sorted_paged_list(benchmark, size):
+    data = SortedPagedList(_values(size, 0))
+    probes = _values(INSERTS, 1)
+
+    def run():
+        for value in probes:
+            data.bisect_left(value)
+
+    benchmark(run)
@@ -0,0 +1,75 @@
+"""ThreadSafePagedList throughput with several threads.
+
+Each thread reads and writes items on its own range of pages, so that,
+on a free-threaded Python build, the time per round should stay about
+flat as threads (up to the number of cores) are added. On builds with
+a GIL, it grows linearly with the thread count.
+
+Run with: pytest tests/benchmarks --benchmark-only
+"""
+
+import os
+import random
+import threading
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from extralist import ThreadSafePagedList  # noqa: E402
+
+PAGESIZE = 1000
+PAGES_PER_THREAD = 16
+OPERATIONS = 20_000
+THREAD_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def _worker(data, first_page, operations):
+    rng = random.Random(first_page)
+    low = first_page * PAGESIZE
+    high = low + PAGES_PER_THREAD * PAGESIZE
+    for _ in range(operations):
+        i = rng.randrange(low, high)
+        data[i] = data[i] + 1
+
+
+@pytest.mark.parametrize("threads", THREAD_COUNTS)
+def test_item_updates_per_thread(benchmark, threads):
+    data = ThreadSafePagedList([0] * (threads * PAGES_PER_THREAD * PAGESIZE), PAGESIZE)
+
+    def run():
+        workers = [
+            threading.Thread(target=_worker, args=(data, n * PAGES_PER_THREAD, OPERATIONS))
+            for n in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    benchmark.extra_info["threads"] = threads
+    benchmark.extra_info["operations"] = threads * OPERATIONS
+    benchmark.pedantic(run, rounds=5)
+
+
+@pytest.mark.parametrize("threads", THREAD_COUNTS)
+def test_mixed_reads_and_inserts(benchmark, threads):
+    data = ThreadSafePagedList(range(threads * PAGES_PER_THREAD * PAGESIZE), PAGESIZE)
+
+    def worker(n):
+        rng = random.Random(n)
+        for i in range(OPERATIONS):
+            if i % 50:
+                data[rng.randrange(len(data))]
+            else:
+                data.insert(rng.randrange(len(data)), i)
+
+    def run():
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+    benchmark.extra_info["threads"] = threads
+    benchmark.pedantic(run, rounds=3)
@@ -1,6 +1,10 @@
 """Tests for extralist.chunk_sequence."""
 
-from extralist import chunk_sequence
+from array import array
+from collections import deque
+
+import pytest
+from extralist import DoubleLinkedList, PagedList, SlicedView, chunk_sequence
 
 
 def test_chunk_sequence_splits_with_partial_last_chunk():
@@ -28,3 +32,42 @@ def test_chunk_sequence_size_one():
 
 def test_chunk_sequence_accepts_iterator():
     assert list(chunk_sequence(iter([1, 2, 3, 4, 5]), 2)) == [[1, 2], [3, 4], [5]]
+
+
+def test_chunk_sequence_chunk_types():
+    assert list(chunk_sequence(range(5), 2, tuple)) == [(0, 1), (2, 3), (4,)]
+    assert list(chunk_sequence(iter("abcde"), 3, tuple)) == [("a", "b", "c"), ("d", "e")]
+    chunks = list(chunk_sequence([1.0, 2.0, 3.0], 2, array("d")))
+    assert chunks == [array("d", [1.0, 2.0]), array("d", [3.0])]
+    assert list(chunk_sequence(range(7), 3, start=2)) == [[2, 3, 4], [5, 6]]
+
+
+def test_chunk_sequence_memoryview_chunks_do_not_copy():
+    data = bytearray(b"abcdefg")
+    chunks = list(chunk_sequence(data, 3, memoryview))
+    assert [bytes(chunk) for chunk in chunks] == [b"abc", b"def", b"g"]
+    data[0] = ord("A")
+    assert bytes(chunks[0]) == b"Abc"
+    numbers = array("d", range(5))
+    chunks = chunk_sequence(numbers, 2, memoryview)
+    assert [chunk.tolist() for chunk in chunks] == [[0, 1], [2, 3], [4]]
+    with pytest.raises(TypeError):
+        list(chunk_sequence([1, 2], 1, memoryview))
+    with pytest.raises(ValueError):
+        list(chunk_sequence([1, 2], 0))
+
+
+def test_chunk_sequence_non_sliceable_sequences():
+    expected = [[0, 1], [2, 3], [4]]
+    assert list(chunk_sequence(deque(range(5)), 2)) == expected
+    assert list(chunk_sequence(DoubleLinkedList(range(5)), 2)) == expected
+    assert list(chunk_sequence(SlicedView(list(range(5)), slice(0, 5)), 2)) == expected
+    assert list(chunk_sequence(PagedList(range(5), 2), 2)) == expected
+    assert list(chunk_sequence(deque(range(7)), 3, tuple, start=2)) == [(2, 3, 4), (5, 6)]
+
+
+def test_chunk_sequence_start_applies_to_iterators():
+    iterator = iter(range(10))
+    next(iterator)
+    assert list(chunk_sequence(iterator, 3, start=2)) == [[3, 4, 5], [6, 7, 8], [9]]
+    assert list(chunk_sequence((i for i in range(5)), 2, start=1)) == [[1, 2], [3, 4]]
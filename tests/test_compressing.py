@@ -0,0 +1,65 @@
+import pickle
+import time
+from array import array
+
+import pytest
+from extralist import CompressingPagedList
+
+
+def test_cold_pages_are_compressed_and_restored():
+    x = CompressingPagedList(range(1000), 10, cold_after=5)
+    stats = x.compression_stats()
+    assert stats["compressed_pages"] >= 90
+    assert stats["compressions"] == stats["compressed_pages"]
+    assert list(x) == list(range(1000))
+    stats = x.compression_stats()
+    assert stats["decompressions"] >= 90
+    assert stats["compressed_pages"] >= 90
+
+
+def test_compression_ratio_and_codecs():
+    for codec in ("zlib", "lzma"):
+        x = CompressingPagedList([0] * 10000, 1000, cold_after=1, codec=codec)
+        stats = x.compression_stats()
+        assert stats["ratio"] > 10
+        assert stats["raw_bytes"] > stats["compressed_bytes"]
+        assert x[5500] == 0
+
+
+def test_array_pages_compress_raw_buffers():
+    x = CompressingPagedList(array("d", range(100)), 10, page_class=array("d"), cold_after=1)
+    assert x.compression_stats()["raw_bytes"] == 9 * 10 * 8
+    assert x[15] == 15.0
+    assert isinstance(x.pages[1].data, array)
+    assert x.sum() == sum(range(100))
+
+
+def test_cold_seconds():
+    x = CompressingPagedList(range(100), 10, cold_after=None, cold_seconds=0.01)
+    assert x.compression_stats()["compressed_pages"] == 0
+    time.sleep(0.02)
+    x.compress_cold()
+    assert x.compression_stats()["compressed_pages"] == 10
+    assert x[:] == list(range(100))
+
+
+def test_copies_and_slices_keep_compressed_pages():
+    x = CompressingPagedList(range(100), 10, cold_after=3)
+    x.slice_to_paged = True
+    y = x.copy()
+    z = x[15:85]
+    assert type(y) is type(z) is CompressingPagedList
+    assert y.compression_stats()["compressed_pages"] > 0
+    y[0] = "y"
+    assert x[0] == 0
+    assert list(z) == list(range(15, 85))
+    assert pickle.loads(pickle.dumps(z))[:] == list(range(15, 85))
+
+
+def test_option_checks():
+    with pytest.raises(ValueError):
+        CompressingPagedList(codec="bz2")
+    with pytest.raises(ValueError):
+        CompressingPagedList(cold_after=0)
+    with pytest.raises(ValueError):
+        CompressingPagedList(cold_seconds=0)
@@ -5,32 +5,47 @@ import inspect
 
 import extralist
 from extralist import (
+    CompressingPagedList,
     DefaultList,
     DoubleLinkedList,
     PagedList,
+    PagedText,
     SliceableSequenceMixin,
     SlicedView,
+    SortedPagedList,
+    SpillingPagedList,
     StructSequence,
+    ThreadSafePagedList,
     chunk_sequence,
 )
 
 # Prefer importlib so submodule objects are not confused with same-named exports.
+compressing = importlib.import_module("extralist.compressing")
 defaultlist = importlib.import_module("extralist.defaultlist")
 linked = importlib.import_module("extralist.linked")
 pagedlist = importlib.import_module("extralist.pagedlist")
+pagedtext = importlib.import_module("extralist.pagedtext")
 slicedview = importlib.import_module("extralist.slicedview")
+sortedpagedlist = importlib.import_module("extralist.sortedpagedlist")
+spilling = importlib.import_module("extralist.spilling")
 structsequence = importlib.import_module("extralist.structsequence")
+threadsafe = importlib.import_module("extralist.threadsafe")
 sliceable_module = importlib.import_module("extralist.sliceable")
 version_module = importlib.import_module("extralist.version")
 
 
 # Main public classes defined in package modules and re-exported at package root.
 MODULE_PUBLIC_NAMES = {
+    compressing: ("CompressingPagedList",),
     defaultlist: ("DefaultList",),
     linked: ("DoubleLinkedList",),
     pagedlist: ("PagedList",),
+    pagedtext: ("PagedText",),
     slicedview: ("SlicedView",),
+    sortedpagedlist: ("SortedPagedList",),
+    spilling: ("SpillingPagedList",),
     structsequence: ("StructSequence",),
+    threadsafe: ("ThreadSafePagedList",),
     sliceable_module: ("SliceableSequenceMixin",),
 }
 
@@ -53,11 +68,16 @@ def test_all_names_are_importable_attributes():
 
 def test_star_import_names_match_all():
     exported = {
+        "CompressingPagedList": CompressingPagedList,
         "DefaultList": DefaultList,
         "DoubleLinkedList": DoubleLinkedList,
         "PagedList": PagedList,
+        "PagedText": PagedText,
         "SlicedView": SlicedView,
+        "SortedPagedList": SortedPagedList,
+        "SpillingPagedList": SpillingPagedList,
         "StructSequence": StructSequence,
+        "ThreadSafePagedList": ThreadSafePagedList,
         "SliceableSequenceMixin": SliceableSequenceMixin,
         "chunk_sequence": chunk_sequence,
         "__version__": extralist.__version__,
@@ -101,11 +121,16 @@ def test_sliceable_decorator_not_exported_at_package_root():
 
 def test_exported_types_are_classes_or_expected_callables():
     class_names = {
+        "CompressingPagedList",
         "DefaultList",
         "DoubleLinkedList",
         "PagedList",
+        "PagedText",
         "SlicedView",
+        "SortedPagedList",
+        "SpillingPagedList",
         "StructSequence",
+        "ThreadSafePagedList",
         "SliceableSequenceMixin",
     }
     for name in class_names:
@@ -1,5 +1,16 @@
+import asyncio
+import copy
+import gc
+import io
+import operator
+import random
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import pytest
-from extralist import PagedList
+from extralist import PagedList, SlicedView
+
 
 def test_single_item_access():
     x = PagedList(list(range(100)), 10)
@@ -59,7 +70,7 @@ def test_length():
     x = PagedList(range(100), 10)
     x[:] = []
     assert len(x) == 0
-    assert len(x.pages) == 2
+    assert len(x.pages) == 1
     assert len(x.pages[0].data) == 0
     x[5:15] = range(30)
     assert len(x) == 120
@@ -154,3 +165,607 @@ def test_slice_to_paged_same_page_returns_paged_list():
     y = x[2:5]
     assert type(y) is PagedList
     assert list(y) == [2, 3, 4]
+
+
+def test_scattered_inserts_and_deletes_match_list():
+    random.seed(1)
+    control = list(range(1000))
+    x = PagedList(range(1000), 10)
+    for i in range(2000):
+        position = random.randrange(0, len(control) + 1)
+        if i % 3:
+            control.insert(position, -i)
+            x.insert(position, -i)
+        elif position < len(control):
+            del control[position]
+            del x[position]
+    assert len(x) == len(control)
+    assert [x[i] for i in range(len(control))] == control
+    assert x[-1] == control[-1]
+    assert x[100:350] == control[100:350]
+
+
+def test_page_index_offsets_follow_page_lengths():
+    x = PagedList(range(100), 10)
+    x.insert(15, "a")
+    del x[50:73]
+    x[80:80] = range(25)
+    offset = 0
+    for page_number, page in enumerate(x.pages):
+        assert x._get_offset_for_page(page_number) == offset
+        offset += len(page.data)
+    assert len(x) == offset
+
+
+def test_length_counter_is_consistent_in_debug_mode():
+    x = PagedList(range(100), 10)
+    x.debug = True
+    x.insert(0, "a")
+    x.insert(-1, "b")
+    del x[5]
+    del x[10:45]
+    del x[::7]
+    x[3:3] = range(40)
+    x[20:30] = []
+    control = list(x)
+    assert len(x) == len(control)
+    assert x[-len(control)] == control[0]
+
+
+def test_debug_mode_detects_out_of_band_page_changes():
+    x = PagedList(range(100), 10)
+    x.debug = True
+    x.pages[3].data.append("rogue")
+    with pytest.raises(RuntimeError):
+        x.insert(0, "a")
+
+
+def test_hot_spot_inserts_split_pages():
+    x = PagedList(range(100), 10)
+    x.debug = True
+    for i in range(100):
+        x.insert(55, i)
+    assert max(len(page.data) for page in x.pages) <= x.max_pagesize
+    assert list(x) == list(range(55)) + list(range(99, -1, -1)) + list(range(55, 100))
+
+
+def test_deletes_merge_underfull_pages():
+    x = PagedList(range(100), 10)
+    x.debug = True
+    for _ in range(45):
+        del x[20]
+    assert list(x) == list(range(20)) + list(range(65, 100))
+    assert min(len(page.data) for page in x.pages) >= x.min_pagesize
+    assert len(x.pages) < 10
+
+
+def test_page_size_limits_are_configurable():
+    x = PagedList(range(100), 10, max_pagesize=12, min_pagesize=5)
+    x.debug = True
+    for i in range(10):
+        x.insert(3, i)
+    assert max(len(page.data) for page in x.pages) <= 12
+    del x[:8]
+    assert min(len(page.data) for page in x.pages) >= 5
+    x.slice_to_paged = True
+    assert x[10:50].max_pagesize == 12
+    with pytest.raises(ValueError):
+        PagedList(range(10), 10, max_pagesize=10, min_pagesize=6)
+
+
+def test_iteration_and_searches_match_list():
+    control = list(range(100)) * 2
+    x = PagedList(control, 7)
+    del x[30:40]
+    del control[30:40]
+    x.insert(3, 50)
+    control.insert(3, 50)
+    assert list(x) == control
+    assert list(reversed(x)) == control[::-1]
+    assert 50 in x and 200 not in x
+    assert x.count(50) == control.count(50) == 3
+    assert x.index(50) == control.index(50)
+    assert x.index(50, 4) == control.index(50, 4)
+    assert x.index(50, -100) == control.index(50, -100)
+    with pytest.raises(ValueError):
+        x.index(50, 4, 41)
+    with pytest.raises(ValueError):
+        x.index(200)
+
+
+def test_iteration_detects_changes_to_the_list():
+    x = PagedList(range(100), 10)
+    with pytest.raises(RuntimeError):
+        for item in x:
+            if item == 5:
+                x.append("a")
+    with pytest.raises(RuntimeError):
+        for item in reversed(x):
+            if item == 95:
+                del x[-1]
+    for i, item in enumerate(x):
+        x[i] = -item
+    assert x[:5] == [0, -1, -2, -3, -4]
+
+
+def test_multi_page_slice_read():
+    x = PagedList(range(1000), 10)
+    del x[15]
+    x.insert(500, "a")
+    control = list(x)
+    assert x[5:995] == control[5:995]
+    assert x[10:20] == control[10:20]
+    assert x[-30:] == control[-30:]
+
+
+def test_multi_page_slice_read_builds_page_class_once():
+    class CountedList(list):
+        calls = 0
+
+        def __init__(self, *args):
+            CountedList.calls += 1
+            super().__init__(*args)
+
+    x = PagedList(range(1000), 10, page_class=CountedList)
+    CountedList.calls = 0
+    y = x[5:995]
+    assert type(y) is CountedList
+    assert CountedList.calls == 1
+    assert y == list(range(5, 995))
+
+
+def test_copy_shares_pages_until_written():
+    x = PagedList(range(100), 10)
+    y = x.copy()
+    assert list(y) == list(x)
+    assert all(a.data is b.data for a, b in zip(x.pages, y.pages, strict=True))
+    y[15] = "y"
+    x.insert(55, "x")
+    del y[90:]
+    assert x[15] == 15 and y[15] == "y"
+    assert x[55] == "x" and y[55] == 55
+    assert len(x) == 101 and len(y) == 90
+    assert x.pages[0].data is y.pages[0].data
+    assert x.pages[1].data is not y.pages[1].data
+    assert copy.copy(x).pages[0].data is x.pages[0].data
+
+
+def test_unshared_page_is_not_copied_on_write():
+    x = PagedList(range(100), 10)
+    y = x.copy()
+    del y
+    # Without reference counting (PyPy), the copy pages go only with a collection
+    gc.collect()
+    data = x.pages[3].data
+    x[35] = "x"
+    assert x.pages[3].data is data
+
+
+def test_paged_slices_share_middle_pages():
+    x = PagedList(range(100), 10)
+    x.slice_to_paged = True
+    y = x[15:85]
+    assert list(y) == list(range(15, 85))
+    assert y.pages[1].data is x.pages[2].data
+    y[10] = "y"
+    assert x[25] == 25
+    x[30] = "x"
+    assert y[15] == 30
+
+
+def test_append_fills_pages_up_to_pagesize():
+    x = PagedList(range(25), 10)
+    x.debug = True
+    for i in range(25, 60):
+        x.append(i)
+    assert list(x) == list(range(60))
+    assert [len(page.data) for page in x.pages] == [10, 10, 10, 10, 10, 10]
+
+
+def test_extend_adds_whole_pages():
+    x = PagedList(range(25), 10)
+    x.debug = True
+    x.extend(range(25, 48))
+    x.extend(iter(range(48, 71)))
+    x.extend([])
+    x.extend(i for i in range(71, 73))
+    assert list(x) == list(range(73))
+    assert [len(page.data) for page in x.pages] == [10] * 7 + [3]
+    x.extend(x)
+    assert list(x) == list(range(73)) * 2
+    x += range(3)
+    assert x[-4:] == [72, 0, 1, 2]
+
+
+def test_slice_assign_from_non_sliceable_sequences():
+    for values in (deque(range(30)), SlicedView(list(range(40)), slice(10, 40)), set(range(30)),
+                   dict.fromkeys(range(30)).keys()):
+        x = PagedList(range(100), 10)
+        x.debug = True
+        x[5:50] = values
+        control = list(range(100))
+        control[5:50] = values
+        assert list(x) == control
+
+
+def test_extend_non_sliceable_sequences():
+    x = PagedList(range(3), 2)
+    x.extend(deque(range(5)))
+    assert list(x) == [0, 1, 2, 0, 1, 2, 3, 4]
+    x += deque(range(3))
+    assert list(x) == [0, 1, 2, 0, 1, 2, 3, 4, 0, 1, 2]
+    y = PagedList(range(3), 2)
+    y.extend(SlicedView(list(range(10)), slice(2, 7)))
+    assert list(y) == [0, 1, 2, 2, 3, 4, 5, 6]
+
+
+def test_extend_empty_list():
+    x = PagedList([], 10)
+    x.extend(range(15))
+    assert list(x) == list(range(15))
+    assert len(x.pages) == 2
+
+
+def test_cursor_editing_matches_list():
+    random.seed(2)
+    control = list(range(200))
+    x = PagedList(range(200), 10)
+    x.debug = True
+    cursor = x.cursor(50)
+    position = 50
+    for i in range(2000):
+        action = random.randrange(4)
+        if action == 0:
+            cursor.insert(-i)
+            control.insert(position, -i)
+            position += 1
+        elif action == 1 and position < len(control):
+            cursor.delete()
+            del control[position]
+        elif action == 2:
+            delta = random.randrange(-3, 4)
+            if 0 <= position + delta <= len(control):
+                cursor.move(delta)
+                position += delta
+        elif position < len(control):
+            assert cursor.read() == control[position]
+            cursor.write(i)
+            control[position] = i
+        assert cursor.position == position
+    assert list(x) == control
+
+
+def test_cursor_follows_position_after_outside_changes():
+    x = PagedList(range(100), 10)
+    cursor = x.cursor(-10)
+    assert cursor.read() == 90
+    x.insert(0, "a")
+    assert cursor.position == 90
+    assert cursor.read() == 89
+    del x[50:]
+    assert cursor.position == 50
+    with pytest.raises(IndexError):
+        cursor.read()
+    cursor.move(-1)
+    assert cursor.read() == 48
+    with pytest.raises(IndexError):
+        cursor.move(2)
+    cursor.seek(0)
+    assert cursor.read() == "a"
+
+
+def test_array_pages():
+    x = PagedList(range(100), 10, page_class=array("d"))
+    x.debug = True
+    assert type(x.pages[0].data) is array and x.pages[0].data.typecode == "d"
+    x.insert(15, 0.5)
+    x[20:25] = [1, 2, 3]
+    x[50:52] = range(30)
+    del x[70:90]
+    control = list(x)
+    y = x[5:95]
+    assert type(y) is array and y.typecode == "d"
+    assert list(y) == control[5:95]
+    assert list(x[2:8]) == control[2:8]
+    assert x.sum() == sum(control)
+    assert x.min() == min(control) and x.max() == max(control)
+    assert x.count(2) == control.count(2)
+    assert x.positions(2.0) == [i for i, v in enumerate(control) if v == 2]
+    with pytest.raises(TypeError):
+        x[0:2] = ["a", "b"]
+
+
+def test_array_page_reductions_with_numpy():
+    pytest.importorskip("numpy")
+    for typecode in "dil":
+        control = [(i * 37) % 101 - 50 for i in range(1000)]
+        x = PagedList(control, 64, page_class=array(typecode))
+        x.insert(300, 7)
+        control.insert(300, 7)
+        del x[0:64]
+        del control[0:64]
+        assert x._vectorized()
+        assert x.sum() == sum(control) and x.sum(5) == sum(control) + 5
+        assert x.min() == min(control) and x.max() == max(control)
+        assert x.positions(7) == [i for i, v in enumerate(control) if v == 7]
+        assert x.positions(1000) == []
+    with pytest.raises(ValueError):
+        PagedList([], 4, page_class=array("d")).min()
+
+
+def test_reductions_on_list_pages():
+    x = PagedList([5, 3, 8, 3, 1, 9, 3] * 10, 4)
+    assert x.sum() == 320
+    assert x.sum(10) == 330
+    assert x.min() == 1 and x.max() == 9
+    assert x.positions(3) == [i for i in range(70) if i % 7 in (1, 3, 6)]
+    with pytest.raises(ValueError):
+        PagedList([], 4).max()
+
+
+def test_dump_and_load():
+    x = PagedList(range(1000), 10, max_pagesize=40)
+    x.insert(500, "a")
+    stream = io.BytesIO()
+    x.dump(stream)
+    for lazy in (False, True):
+        stream.seek(0)
+        y = PagedList.load(stream, lazy=lazy)
+        assert [len(page.data) for page in y.pages] == [len(page.data) for page in x.pages]
+        assert y.max_pagesize == 40
+        assert y[500] == "a"
+        assert list(y) == list(x)
+    with pytest.raises(ValueError):
+        PagedList.load(io.BytesIO(b"not a dump"))
+
+
+def test_lazy_load_reads_pages_on_access():
+    x = PagedList(array("i", range(1000)), 100, page_class=array("i"))
+    stream = io.BytesIO()
+    x.dump(stream)
+    assert len(stream.getvalue()) < 1000 * 4 + 500
+    stream.seek(0)
+    y = PagedList.load(stream, lazy=True)
+    assert len(y) == 1000
+    assert all(page.reader is not None for page in y.pages)
+    assert y[555] == 555
+    assert sum(page.reader is None for page in y.pages) == 1
+    y.insert(0, -1)
+    assert isinstance(y.pages[0].data, array)
+    assert list(y) == [-1] + list(range(1000))
+
+
+def test_map_filter_and_reduce_pages():
+    x = PagedList(range(1000), 10)
+    y = x.map_pages(str)
+    assert type(y) is PagedList and y.pagesize == 10
+    assert [len(page.data) for page in y.pages] == [len(page.data) for page in x.pages]
+    assert list(y) == [str(i) for i in range(1000)]
+    assert x.reduce_pages(sum, operator.add) == sum(range(1000))
+    assert x.reduce_pages(min, min) == 0
+    x.filter_inplace(lambda item: item % 10 < 2)
+    x.debug = True
+    assert list(x) == [i for i in range(1000) if i % 10 < 2]
+    assert all(x.min_pagesize <= len(page.data) <= x.max_pagesize for page in x.pages)
+    x.filter_inplace(lambda item: False)
+    assert len(x) == 0 and len(x.pages) == 1
+    assert x.reduce_pages(sum, operator.add, 0) == 0
+    with pytest.raises(TypeError):
+        x.reduce_pages(sum, operator.add)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_page_operations_on_executors(executor_class):
+    x = PagedList(array("d", range(1000)), 100, page_class=array("d"))
+    with executor_class(max_workers=2) as executor:
+        y = x.map_pages(abs, executor=executor)
+        assert isinstance(y.pages[0].data, array)
+        assert x.reduce_pages(max, max, executor=executor) == 999
+        x.filter_inplace(bool, executor=executor)
+    assert list(y) == list(range(1000))
+    assert list(x) == list(range(1, 1000))
+
+
+def test_remove_if_and_retain():
+    random.seed(3)
+    control = [random.randrange(100) for _ in range(2000)]
+    x = PagedList(control, 50)
+    x.debug = True
+    y = x.copy()
+    x.remove_if(lambda item: item < 30)
+    control = [item for item in control if item >= 30]
+    assert list(x) == control
+    assert all(len(page.data) >= x.min_pagesize for page in x.pages)
+    x.retain(lambda item: item % 2)
+    control = [item for item in control if item % 2]
+    assert list(x) == control
+    version = x._version
+    x.retain(lambda item: True)
+    assert x._version == version
+    x.remove_if(lambda item: True)
+    assert list(x) == [] and len(x.pages) == 1
+    assert len(y) == 2000
+
+
+def test_insert_many_matches_sequential_inserts():
+    random.seed(5)
+    control = list(range(500))
+    x = PagedList(control, 10)
+    x.debug = True
+    y = x.copy()
+    pairs = [(random.randrange(-600, 600), -i) for i in range(300)]
+    for index, value in pairs:
+        control.insert(index, value)
+    x.insert_many(pairs)
+    assert list(x) == control
+    assert all(len(page.data) <= x.max_pagesize for page in x.pages)
+    assert list(y) == list(range(500))
+    x.insert_many([])
+    assert list(x) == control
+
+
+def test_reverse_sort_and_rotate():
+    random.seed(7)
+    control = [random.randrange(1000) for _ in range(500)]
+    x = PagedList(control, 10)
+    x.debug = True
+    y = x.copy()
+    x.reverse()
+    control.reverse()
+    assert list(x) == control
+    assert list(y) == control[::-1]
+    x.sort(key=lambda item: item % 10)
+    control.sort(key=lambda item: item % 10)
+    assert list(x) == control
+    x.sort(reverse=True)
+    control.sort(reverse=True)
+    assert list(x) == control
+    for n in (3, -17, 500, 1234, 0):
+        pages = set(map(id, x.pages))
+        x.rotate(n)
+        control = deque(control)
+        control.rotate(n)
+        control = list(control)
+        assert list(x) == control
+        assert len(pages & set(map(id, x.pages))) >= len(x.pages) - 3
+    z = PagedList([3, 1, 2], 10)
+    z.sort()
+    assert list(z) == [1, 2, 3]
+
+
+def test_instrumentation():
+    x = PagedList(range(100), 10)
+    assert "lookups" not in x.stats()
+    events = []
+    x.instrument(callback=lambda event, args: events.append(event))
+    y = x[:]
+    y = x.copy()
+    x[5] = "a"
+    x[3:5] = [1]
+    x[3:50] = []
+    x[::2] = x[::2]
+    stats = x.stats()
+    assert stats["slice_writes_in_page"] == stats["slice_writes_across_pages"] == 1
+    assert stats["slice_writes_extended"] == 1
+    assert stats["page_copies"] >= 1 and stats["page_writes"] >= stats["page_copies"]
+    assert stats["lookups"] > 0
+    assert stats["pages"] == len(x.pages) and stats["length"] == len(x) == len(y) - 48
+    assert stats["page_sizes"]["max"] <= x.max_pagesize
+    assert events.count("slice_writes_extended") == 1
+    x.instrument(False)
+    assert "lookups" not in x.stats()
+    assert "_get_indices" not in vars(x)
+    assert copy.copy(x)[:] == x[:]
+
+
+def test_deque_operations():
+    control = deque(range(50))
+    x = PagedList(range(50), 10)
+    x.debug = True
+    for i in range(500):
+        x.append(i)
+        control.append(i)
+        if i % 3:
+            assert x.popleft() == control.popleft()
+    assert list(x) == list(control)
+    assert all(len(page.data) for page in x.pages)
+    x.appendleft("a")
+    x.extendleft(range(25))
+    control.appendleft("a")
+    control.extendleft(range(25))
+    assert list(x) == list(control)
+    # New pages are prepended whole, the partial one first
+    assert len(x.pages[0].data) <= 10 and [len(page.data) for page in x.pages[1:3]] == [10, 10]
+    assert x.pop() == control.pop()
+    assert x.pop(30) == list(control)[30]
+    with pytest.raises(IndexError):
+        PagedList().popleft()
+
+
+def test_deque_operations_update_the_index_at_the_ends():
+    random.seed(4)
+    control = deque(range(400))
+    x = PagedList(range(400), 4)
+    x.debug = True
+    for i in range(3000):
+        action = random.randrange(4)
+        if action == 0:
+            x.append(i)
+            control.append(i)
+        elif action == 1:
+            x.appendleft(i)
+            control.appendleft(i)
+        elif action == 2 and control:
+            assert x.popleft() == control.popleft()
+        elif control:
+            assert x.pop() == control.pop()
+        if control:
+            position = random.randrange(len(control))
+            assert x[position] == control[position]
+    assert list(x) == list(control)
+    # Emptying the list from the front, then refilling it
+    for _ in range(len(control)):
+        assert x.popleft() == control.popleft()
+    x.extendleft(range(100))
+    control.extendleft(range(100))
+    assert list(x) == list(control) and x[50] == control[50]
+
+
+@pytest.mark.parametrize("executor_class", [None, ProcessPoolExecutor])
+def test_from_file(executor_class):
+    lines = b"".join(b"%d\n" % i for i in range(5000))
+    executor = executor_class(max_workers=2) if executor_class else None
+    try:
+        x = PagedList.from_file(
+            io.BytesIO(lines), int, executor=executor, block_size=1000, pagesize=300
+        )
+    finally:
+        if executor:
+            executor.shutdown()
+    assert list(x) == list(range(5000))
+    assert x.pagesize == 300 and len(x.pages) == 17
+    x = PagedList.from_file(io.BytesIO(b"abcdefghi"), record_size=3, block_size=4)
+    assert list(x) == [b"abc", b"def", b"ghi"]
+    with pytest.raises(ValueError):
+        PagedList.from_file(io.BytesIO(b"abcdefgh"), record_size=3)
+    x = PagedList.from_file(io.BytesIO(b"no newline\nat end"))
+    assert list(x) == [b"no newline", b"at end"]
+    assert list(PagedList.from_file(io.BytesIO(b"a\rb\n"))) == [b"a\rb"]
+    assert list(PagedList.from_file(io.BytesIO(b"crlf\r\nend\r\n\n"))) == [b"crlf", b"end", b""]
+
+
+def test_async_fill_and_iteration():
+    async def produce(count):
+        for i in range(count):
+            if i % 100 == 0:
+                await asyncio.sleep(0)
+            yield i
+
+    async def scan(x, log):
+        total = 0
+        async for data in x.aiter_pages():
+            log.append("page")
+            total += sum(data)
+        return total
+
+    async def ticker(log):
+        for _ in range(3):
+            log.append("tick")
+            await asyncio.sleep(0)
+
+    async def main():
+        x = await PagedList.afrom(produce(1050), pagesize=100)
+        assert list(x) == list(range(1050)) and len(x.pages) == 11
+        assert [item async for item in x] == list(range(1050))
+        log = []
+        total, _ = await asyncio.gather(scan(x, log), ticker(log))
+        assert total == sum(range(1050))
+        # The ticker ran between pages, not after the whole scan
+        assert log.index("tick", 1) < len(log) - 3
+        empty = await PagedList.afrom(produce(0))
+        assert len(empty) == 0 and len(empty.pages) == 1
+        with pytest.raises(RuntimeError):
+            async for item in x:
+                x.append(item)
+
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+import pickle
+import random
+
+import pytest
+from extralist import PagedText
+
+
+def test_edits_match_str():
+    random.seed(0)
+    control = "".join(random.choice("abcde ") for _ in range(2000))
+    x = PagedText(control, 50)
+    x.debug = True
+    for i in range(300):
+        position = random.randrange(len(control) + 1)
+        if i % 2:
+            text = f"<{i}>"
+            x.insert_str(position, text)
+            control = control[:position] + text + control[position:]
+        else:
+            x.delete_range(position, position + 7)
+            control = control[:position] + control[position + 7:]
+    assert str(x) == control
+    assert len(x) == len(control)
+    assert x[100:700] == control[100:700]
+    assert x[700:100:-3] == control[700:100:-3]
+    assert x[5] == control[5]
+
+
+def test_find_and_count_across_pages():
+    x = PagedText("abcabcabc", 2)
+    assert x.find("cab") == 2
+    assert x.find("cab", 3) == 5
+    assert x.find("cab", 3, 7) == -1
+    assert x.find("abcabc", 1) == 3
+    assert x.find("") == 0 and x.find("", 10) == -1
+    assert x.count("abc") == 3
+    assert x.count("bcab") == 1
+    assert x.count("") == 10
+    assert "ca" in x and "cc" not in x
+    assert x.index("ca", 3) == 5
+    with pytest.raises(ValueError):
+        x.index("x")
+    random.seed(1)
+    text = "".join(random.choice("ab") for _ in range(500))
+    x = PagedText(text, 7)
+    for _ in range(200):
+        sub = "".join(random.choice("ab") for _ in range(random.randrange(1, 12)))
+        start, end = sorted(random.randrange(-10, 510) for _ in range(2))
+        assert x.find(sub, start, end) == text.find(sub, start, end)
+        assert x.count(sub, start, end) == text.count(sub, start, end)
+
+
+def test_bytes_buffers():
+    x = PagedText(b"spam\x00eggs\x00ham", 3)
+    assert isinstance(x.pages[0].data, bytearray)
+    assert bytes(x) == b"spam\x00eggs\x00ham"
+    assert x[2:8] == b"am\x00egg"
+    assert x[4] == 0
+    assert x.find(b"\x00ham") == 9
+    assert x.count(0) == 2 and 0 in x
+    x.insert_str(4, b"!")
+    x.delete_range(0, 2)
+    assert bytes(x) == b"am!\x00eggs\x00ham"
+    with pytest.raises(TypeError):
+        bytes(PagedText("text"))
+    with pytest.raises(TypeError):
+        PagedText("text").find(b"t")
+
+
+def test_items_are_characters():
+    x = PagedText("abc", 2)
+    x[1] = "B"
+    x.append("d")
+    with pytest.raises(TypeError):
+        x[0] = "xy"
+    with pytest.raises(TypeError):
+        x.insert(0, 1)
+    x[1:3] = "---"
+    assert str(x) == "a---d"
+    assert x.pop() == "d"
+    with pytest.raises(TypeError):
+        x[1:2] = ["xy"]
+    with pytest.raises(TypeError):
+        x.extend(["xy", "z"])
+    assert str(x) == "a---"
+
+
+def test_multi_character_items_are_rejected_on_full_pages():
+    x = PagedText("abcd", 2)
+    x.debug = True
+    with pytest.raises(TypeError):
+        x.append("xyz")
+    with pytest.raises(TypeError):
+        x.appendleft("xyz")
+    x.append("e")
+    x.appendleft("z")
+    assert str(x) == "zabcde"
+    assert len(x) == 6
+
+
+def test_inherited_operations():
+    x = PagedText("the quick brown fox", 4)
+    x.slice_to_paged = True
+    y = x[4:9]
+    assert isinstance(y, PagedText) and str(y) == "quick"
+    z = x.copy()
+    z.insert_str(0, ">")
+    assert str(x) == "the quick brown fox"
+    x.reverse()
+    assert str(x) == "xof nworb kciuq eht"
+    x.sort()
+    assert str(x) == "".join(sorted("the quick brown fox"))
+    assert str(pickle.loads(pickle.dumps(z))) == ">the quick brown fox"
+    assert repr(PagedText("ab")) == "PagedText('ab')"
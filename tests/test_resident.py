@@ -0,0 +1,56 @@
+import pickle
+import random
+
+import pytest
+from extralist import CompressingPagedList, SpillingPagedList
+
+
+def _spilling(sequence, tmp_path):
+    return SpillingPagedList(sequence, 10, max_resident_pages=2, spill_dir=tmp_path)
+
+
+def _compressing(sequence, tmp_path):
+    return CompressingPagedList(sequence, 10, cold_after=2)
+
+
+@pytest.mark.parametrize("factory, stats, counter", [
+    (_spilling, "cache_stats", "writebacks"),
+    (_compressing, "compression_stats", "decompressions"),
+])
+def test_mutations_match_list(factory, stats, counter, tmp_path):
+    random.seed(0)
+    control = list(range(500))
+    x = factory(range(500), tmp_path)
+    x.debug = True
+    for i in range(500):
+        position = random.randrange(len(control) + 1)
+        action = random.randrange(5)
+        if action == 0:
+            x.insert(position, -i)
+            control.insert(position, -i)
+        elif action == 1 and position < len(control):
+            x[position] = i
+            control[position] = i
+        elif action == 2:
+            x[position: position + 5] = range(12)
+            control[position: position + 5] = range(12)
+        elif action == 3 and i % 50 == 0:
+            x.reverse()
+            control.reverse()
+        else:
+            del x[position: position + 3]
+            del control[position: position + 3]
+    assert list(x) == control
+    assert getattr(x, stats)()[counter] > 0
+
+
+@pytest.mark.parametrize("factory", [_spilling, _compressing])
+def test_pickle_keeps_options_and_settings(factory, tmp_path):
+    x = factory(range(100), tmp_path)
+    x.slice_to_paged = True
+    y = pickle.loads(pickle.dumps(x))
+    assert type(y) is type(x)
+    assert list(y) == list(range(100))
+    assert y._options() == x._options()
+    assert y.slice_to_paged and not y.debug
+    assert type(y[10:50]) is type(x)
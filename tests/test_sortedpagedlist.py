@@ -0,0 +1,136 @@
+import asyncio
+import random
+
+import pytest
+from extralist import SortedPagedList
+
+
+def test_add_and_discard_keep_items_sorted():
+    random.seed(0)
+    control = []
+    x = SortedPagedList(pagesize=10)
+    x.debug = True
+    for i in range(2000):
+        value = random.randrange(500)
+        if i % 3 == 2:
+            x.discard(value)
+            if value in control:
+                control.remove(value)
+        else:
+            x.add(value)
+            control.append(value)
+            control.sort()
+    assert list(x) == control
+    assert len(x) == len(control)
+    assert max(len(page.data) for page in x.pages) <= x.max_pagesize
+
+
+def test_initial_items_are_sorted():
+    x = SortedPagedList([5, 3, 9, 1, 3], pagesize=2)
+    assert list(x) == [1, 3, 3, 5, 9]
+    assert x[1:4] == [3, 3, 5]
+
+
+def test_searches():
+    x = SortedPagedList(list(range(0, 200, 2)) * 2, pagesize=7)
+    assert x.bisect_left(10) == 10
+    assert x.bisect_right(10) == 12
+    assert x.bisect_left(11) == x.bisect_right(11) == 12
+    assert x.bisect_left(-1) == 0
+    assert x.bisect_right(1000) == 200
+    assert x.index(10) == 10
+    assert x.index(10, 11) == 11
+    with pytest.raises(ValueError):
+        x.index(10, 12)
+    with pytest.raises(ValueError):
+        x.index(11)
+    assert 10 in x and 11 not in x
+    assert x.count(10) == 2 and x.count(11) == 0
+    assert list(x.irange(7, 12)) == [8, 8, 10, 10, 12, 12]
+    assert list(x.irange(8, 12, inclusive=(False, False))) == [10, 10]
+    assert list(x.irange(maximum=2)) == [0, 0, 2, 2]
+    assert list(x.irange(196)) == [196, 196, 198, 198]
+    assert list(x.irange(12, 7)) == []
+
+
+def test_remove_and_delete_by_index():
+    x = SortedPagedList(range(100), pagesize=10)
+    x.remove(50)
+    with pytest.raises(ValueError):
+        x.remove(50)
+    del x[:20]
+    del x[-1]
+    assert list(x) == [i for i in range(20, 99) if i != 50]
+    assert x[0] == 20 and x[-1] == 98
+    x.add(50)
+    x.add(-1)
+    assert x[0] == -1 and x.index(50) == 31
+
+
+def test_small_pages_are_never_left_empty():
+    x = SortedPagedList(range(3000), 1000, min_pagesize=0)
+    assert x.min_pagesize == 1
+    del x[1000:2000]
+    assert 5 in x and 1500 not in x
+    random.seed(3)
+    for pagesize in (1, 2, 3):
+        control = []
+        x = SortedPagedList(pagesize=pagesize, min_pagesize=0)
+        for i in range(500):
+            value = random.randrange(50)
+            if i % 5 == 4 and control:
+                start = random.randrange(len(control))
+                del x[start: start + 3]
+                del control[start: start + 3]
+            elif i % 3 == 2:
+                x.discard(value)
+                if value in control:
+                    control.remove(value)
+            else:
+                x.add(value)
+                control.append(value)
+                control.sort()
+            assert (value in x) == (value in control)
+        assert list(x) == control
+        assert all(len(page.data) for page in x.pages)
+
+
+def test_empty_list():
+    x = SortedPagedList()
+    assert x.bisect_left(3) == x.bisect_right(3) == 0
+    assert 3 not in x
+    x.discard(3)
+    assert list(x.irange()) == []
+    x += [3, 1, 2]
+    assert list(x) == [1, 2, 3]
+
+
+def test_positional_changes_are_not_supported():
+    x = SortedPagedList(range(10))
+    with pytest.raises(NotImplementedError):
+        x.insert(0, 5)
+    with pytest.raises(NotImplementedError):
+        x.append(5)
+    with pytest.raises(NotImplementedError):
+        x[0] = 5
+
+
+def test_slices_and_copies_stay_sorted_lists():
+    x = SortedPagedList(range(100), pagesize=10)
+    x.slice_to_paged = True
+    y = x[15:85]
+    z = x.copy()
+    assert type(y) is type(z) is SortedPagedList
+    y.add(50)
+    z.discard(50)
+    assert y.count(50) == 2
+    assert 50 not in z and 50 in x
+
+
+def test_afrom_sorts_the_items():
+    async def produce():
+        for item in (5, 3, 9, 1):
+            yield item
+
+    x = asyncio.run(SortedPagedList.afrom(produce(), pagesize=2))
+    assert list(x) == [1, 3, 5, 9]
@@ -0,0 +1,66 @@
+import os
+import pickle
+
+import pytest
+from extralist import SpillingPagedList
+
+
+def test_contents_survive_eviction(tmp_path):
+    x = SpillingPagedList(range(1000), 10, max_resident_pages=3, spill_dir=tmp_path)
+    assert list(x) == list(range(1000))
+    stats = x.cache_stats()
+    assert stats["resident_pages"] <= 3
+    assert stats["evictions"] >= 97
+    assert stats["misses"] >= 97
+
+
+def test_only_dirty_pages_are_written_back(tmp_path):
+    x = SpillingPagedList(range(100), 10, max_resident_pages=2, spill_dir=tmp_path)
+    list(x)
+    writebacks = x.cache_stats()["writebacks"]
+    list(x)
+    assert x.cache_stats()["writebacks"] == writebacks
+    x[55] = "a"
+    list(x)
+    assert x.cache_stats()["writebacks"] == writebacks + 1
+    assert x[55] == "a"
+
+
+def test_copies_and_slices_keep_spilling(tmp_path):
+    x = SpillingPagedList(range(100), 10, max_resident_pages=2, spill_dir=tmp_path)
+    x.slice_to_paged = True
+    y = x[15:85]
+    z = x.copy()
+    assert type(y) is type(z) is SpillingPagedList
+    assert y.max_resident_pages == 2
+    z[0] = "z"
+    assert list(y) == list(range(15, 85))
+    assert x[0] == 0
+    assert pickle.loads(pickle.dumps(y))[:] == list(range(15, 85))
+
+
+def test_reverse_keeps_few_pages_resident(tmp_path):
+    peak = []
+
+    class Tracking(SpillingPagedList):
+        def _load(self, page):
+            super()._load(page)
+            peak.append(self.cache_stats()["resident_pages"])
+
+    x = Tracking(range(20000), 200, max_resident_pages=4, spill_dir=tmp_path)
+    x.reverse()
+    assert list(x) == list(range(19999, -1, -1))
+    assert max(peak) <= 4
+    assert x.cache_stats()["resident_pages"] <= 4
+
+
+def test_close_removes_spill_files(tmp_path):
+    x = SpillingPagedList(range(100), 10, max_resident_pages=2, spill_dir=tmp_path)
+    assert os.listdir(tmp_path)
+    x.close()
+    assert not os.listdir(tmp_path)
+
+
+def test_max_resident_pages_lower_limit():
+    with pytest.raises(ValueError):
+        SpillingPagedList(range(10), 5, max_resident_pages=1)
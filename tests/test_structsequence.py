@@ -1,7 +1,9 @@
 """Tests for extralist.StructSequence."""
 
-import pytest
+import io
+from concurrent.futures import ProcessPoolExecutor
 
+import pytest
 from extralist import StructSequence
 
 
@@ -67,3 +69,27 @@ def test_repr_contains_name_and_length():
     text = repr(s)
     assert "Point" in text
     assert "1" in text
+
+
+def _parse_point(line):
+    return tuple(int(field) for field in line.split(b","))
+
+
+@pytest.mark.parametrize("executor_class", [None, ProcessPoolExecutor])
+def test_from_file(executor_class):
+    lines = b"".join(b"%d,%d\n" % (i, -i) for i in range(3000))
+    executor = executor_class(max_workers=2) if executor_class else None
+    try:
+        s = StructSequence.from_file(
+            "Point", ("x", "y"), "=ii", io.BytesIO(lines), _parse_point,
+            executor=executor, block_size=500,
+        )
+    finally:
+        if executor:
+            executor.shutdown()
+    assert len(s) == 3000
+    assert (s[2999].x, s[2999].y) == (2999, -2999)
+    packed = StructSequence.from_file(
+        "Point", ("x", "y"), "=ii", io.BytesIO(bytes(s.data)), block_size=100
+    )
+    assert packed.data == s.data
@@ -0,0 +1,142 @@
+import asyncio
+import copy
+import pickle
+import threading
+
+import pytest
+from extralist import PagedList, ThreadSafePagedList
+from extralist.threadsafe import _DirectoryLock
+
+
+def _run_threads(target, count):
+    threads = [threading.Thread(target=target, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_behaves_as_paged_list():
+    x = ThreadSafePagedList(range(100), 10)
+    x.debug = True
+    x.insert(5, -1)
+    del x[20:40]
+    x[0:3] = "abc"
+    x.append(100)
+    x.extend(range(3))
+    x[-1] = "z"
+    control = list(range(100))
+    control.insert(5, -1)
+    del control[20:40]
+    control[0:3] = "abc"
+    control.append(100)
+    control.extend(range(3))
+    control[-1] = "z"
+    assert list(x) == control
+    assert list(reversed(x)) == control[::-1]
+    assert x.pop() == "z"
+    assert x[10:60] == control[10:60]
+    assert x.count(100) == 1
+
+
+def test_copies_and_slices_do_not_share_pages():
+    x = ThreadSafePagedList(range(100), 10)
+    x.slice_to_paged = True
+    y = x.copy()
+    z = x[5:55]
+    assert isinstance(y, ThreadSafePagedList) and isinstance(z, ThreadSafePagedList)
+    assert all(page.refs is None for page in x.pages)
+    x[20] = "changed"
+    assert y[20] == 20 and z[15] == 20
+    assert list(z) == list(range(5, 55))
+
+
+def test_pickle_and_deepcopy():
+    x = ThreadSafePagedList(range(50), 10, max_pagesize=30)
+    x.slice_to_paged = True
+    for y in (pickle.loads(pickle.dumps(x)), copy.deepcopy(x)):
+        assert type(y) is ThreadSafePagedList
+        assert list(y) == list(range(50))
+        assert y.max_pagesize == 30
+        assert y.slice_to_paged and not y.debug
+        y[0] = "y"
+        assert x[0] == 0
+
+
+def test_concurrent_item_writes_on_distinct_pages():
+    x = ThreadSafePagedList([0] * 8000, 1000)
+
+    def worker(n):
+        for _ in range(20):
+            for i in range(n * 1000, (n + 1) * 1000):
+                x[i] += 1
+
+    _run_threads(worker, 8)
+    assert list(x) == [20] * 8000
+
+
+def test_concurrent_inserts_and_deletes():
+    x = ThreadSafePagedList(range(1000), 50)
+    x.debug = True
+
+    def worker(n):
+        for i in range(300):
+            # Never inserted at the end, so that pop only removes appended items
+            x.insert((i * 7 + n) % len(x), ("t", n, i))
+            x.append(i)
+            if i % 3 == 0:
+                assert not isinstance(x.pop(), tuple)
+            x[len(x) // 2]
+
+    _run_threads(worker, 6)
+    assert len(x) == 1000 + 6 * 300 * 2 - 6 * 100
+    assert sorted(item for item in x if isinstance(item, tuple)) == sorted(
+        ("t", n, i) for n in range(6) for i in range(300)
+    )
+
+
+def test_iteration_detects_concurrent_resize():
+    x = ThreadSafePagedList(range(100), 10)
+    iterator = iter(x)
+    next(iterator)
+    x.append(100)
+    with pytest.raises(RuntimeError):
+        list(iterator)
+
+
+def test_cursor_locks_the_list():
+    x = ThreadSafePagedList(range(30), 10)
+    cursor = x.cursor(5)
+    cursor.insert("a")
+    cursor.delete()
+    assert cursor.position == 6
+    assert list(x) == list(range(5)) + ["a"] + list(range(6, 30))
+
+
+def test_new_paged_list_methods_are_exclusive():
+    for name in ("insert", "append", "extend", "pop", "remove", "__delitem__"):
+        assert getattr(ThreadSafePagedList, name) is not getattr(PagedList, name)
+
+
+def test_directory_lock_is_reentrant_and_not_upgradable():
+    lock = _DirectoryLock()
+    lock.acquire_exclusive()
+    lock.acquire_shared()
+    lock.acquire_exclusive()
+    lock.release()
+    lock.release()
+    lock.release()
+    lock.acquire_shared()
+    with pytest.raises(RuntimeError):
+        lock.acquire_exclusive()
+    lock.release()
+
+
+def test_async_iteration_uses_snapshots():
+    x = ThreadSafePagedList(range(30), 10)
+
+    async def scan():
+        return [item async for item in x]
+
+    assert asyncio.run(scan()) == list(range(30))
+    assert ThreadSafePagedList.aiter_pages is not PagedList.aiter_pages